@@ -0,0 +1,54 @@
+# ---------------------------
+# Benchmark: scalar calculator path vs batch mode (rows/sec)
+# Run: python bench_batch.py [rows]
+# ---------------------------
+
+import os, sys, csv, time, tempfile
+import numpy as np
+
+from multi_tool_upgrade import calc_heating_load
+from energy_batch import run_batch
+
+def make_input(path, rows):
+    """Write a random heating-load CSV with the given number of rows."""
+    rng = np.random.default_rng(42)
+    data = np.column_stack((
+        rng.uniform(50, 50_000, rows),   # area m²
+        rng.uniform(0.1, 1.0, rows),     # U-value
+        rng.uniform(5, 30, rows),        # ΔT °C
+    ))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("area,u_value,temp_diff\n")
+        np.savetxt(f, data, delimiter=",", fmt="%.4f")
+
+def scalar_path(in_path, out_path):
+    """One row at a time, the same way the interactive calculator works."""
+    with open(in_path, "r", encoding="utf-8") as f, open(out_path, "w", newline="", encoding="utf-8") as out:
+        w = csv.writer(out)
+        w.writerow(["area", "u_value", "temp_diff", "load_w", "load_kw"])
+        for row in csv.DictReader(f):
+            area, u_value, temp_diff = float(row["area"]), float(row["u_value"]), float(row["temp_diff"])
+            load_watts = calc_heating_load(area, u_value, temp_diff)
+            w.writerow([area, u_value, temp_diff, load_watts, load_watts / 1000])
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        in_path = os.path.join(tmp, "envelopes.csv")
+        make_input(in_path, rows)
+
+        start = time.perf_counter()
+        scalar_path(in_path, os.path.join(tmp, "scalar.csv"))
+        scalar_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_batch("heating", in_path, os.path.join(tmp, "batch.csv"))
+        batch_s = time.perf_counter() - start
+
+    print(f"Rows: {rows:,}")
+    print(f"Scalar path: {rows / scalar_s:>12,.0f} rows/sec ({scalar_s:.2f} s)")
+    print(f"Batch mode:  {rows / batch_s:>12,.0f} rows/sec ({batch_s:.2f} s)")
+    print(f"Speed-up:    {scalar_s / batch_s:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# ---------------------------
+# Stress test: many processes writing report.txt and energy_log.csv at once
+# - N processes start together and each writes M report lines and M energy
+#   readings through ReportWriter / EnergyLogWriter (small batches, so the
+#   per-file locks are taken often)
+# - checks: one CSV header, every line complete, no lines lost, each writer's
+#   lines in its own order, every file in time order, and energy_log.bin
+#   matching the CSV row for row
+# - prints the throughput for 1 process and for N processes
+# Run: python bench_concurrent_writers.py [processes] [records_per_process] [batch]
+# ---------------------------
+
+import os, re, sys, time, tempfile, multiprocessing
+import numpy as np
+
+from writers import ReportWriter, EnergyLogWriter
+from energy_log_bin import load_log
+
+REPORT_LINE = re.compile(r"\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] writer (\d+) record (\d+) x{40}\n")
+
+def writer_process(folder, writer_id, records, batch, start):
+    start.wait()
+    with ReportWriter(os.path.join(folder, "report.txt"), max_records=batch, flush_interval=60) as report, \
+            EnergyLogWriter(os.path.join(folder, "energy_log.csv"), os.path.join(folder, "energy_log.bin"),
+                            max_records=batch, flush_interval=60) as energy:
+        for i in range(records):
+            report.write(f"writer {writer_id} record {i} " + "x" * 40)
+            energy.log(writer_id * 1_000_000 + i)  # the kWh value says who wrote it and in which order
+
+def run(processes, records, batch):
+    """Write with `processes` processes at once; check the files; return seconds taken."""
+    with tempfile.TemporaryDirectory() as folder:
+        start = multiprocessing.Event()
+        workers = [multiprocessing.Process(target=writer_process, args=(folder, w, records, batch, start))
+                   for w in range(processes)]
+        for p in workers:
+            p.start()
+        began = time.perf_counter()
+        start.set()
+        for p in workers:
+            p.join()
+        elapsed = time.perf_counter() - began
+        assert all(p.exitcode == 0 for p in workers), "a writer process failed"
+        check(folder, processes, records)
+    return elapsed
+
+def check(folder, processes, records):
+    seen = [[] for _ in range(processes)]
+    stamps = []
+    with open(os.path.join(folder, "report.txt"), "r", encoding="utf-8") as f:
+        for line in f:
+            m = REPORT_LINE.fullmatch(line)
+            assert m, f"broken report line: {line!r}"
+            stamps.append(m.group(1))
+            seen[int(m.group(2))].append(int(m.group(3)))
+    assert all(s == list(range(records)) for s in seen), "report lines lost or out of order"
+    assert stamps == sorted(stamps), "report.txt not in time order"
+
+    with open(os.path.join(folder, "energy_log.csv"), "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "timestamp,kwh" and lines.count("timestamp,kwh") == 1, "missing or repeated CSV header"
+    kwh = np.array([float(line.rsplit(",", 1)[1]) for line in lines[1:]])
+    stamps = [line.rsplit(",", 1)[0] for line in lines[1:]]
+    assert stamps == sorted(stamps), "energy_log.csv not in time order"
+    writer, seq = np.divmod(kwh.astype(np.int64), 1_000_000)
+    for w in range(processes):
+        assert np.array_equal(seq[writer == w], np.arange(records)), "energy rows lost or out of order"
+    log = load_log(os.path.join(folder, "energy_log.bin"))
+    assert np.array_equal(log["kwh"], kwh), "binary log differs from CSV"
+    assert np.all(np.diff(log["ts"]) >= 0), "energy_log.bin not in time order"
+
+def check_late_batch():
+    """A writer whose batch is older than lines another writer already added (e.g. a batch
+    job with a long flush_interval) must not put the file out of time order."""
+    with tempfile.TemporaryDirectory() as folder:
+        report, csv_path, bin_path = (os.path.join(folder, name)
+                                      for name in ("report.txt", "energy_log.csv", "energy_log.bin"))
+        slow_report = ReportWriter(report, flush_interval=60)
+        slow_energy = EnergyLogWriter(csv_path, bin_path, flush_interval=60)
+        slow_report.write("writer 0 record 0 " + "x" * 40)
+        slow_energy.log(1.0)
+        time.sleep(1.1)                                   # the next writer's lines are a second newer
+        with ReportWriter(report) as fast_report, EnergyLogWriter(csv_path, bin_path) as fast_energy:
+            fast_report.write("writer 1 record 0 " + "x" * 40)
+            fast_energy.log(2.0)
+        slow_report.close()
+        slow_energy.close()
+        with open(report, "r", encoding="utf-8") as f:
+            stamps = [REPORT_LINE.fullmatch(line).group(1) for line in f]
+        with open(csv_path, "r", encoding="utf-8") as f:
+            rows = f.read().splitlines()[1:]
+        assert stamps[0] == stamps[1] and rows[0].split(",")[0] == rows[1].split(",")[0], "late batch out of order"
+        assert np.all(np.diff(load_log(bin_path)["ts"]) == 0)
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    records = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    total = processes * records
+    check_late_batch()
+    single = run(1, total, batch)
+    many = run(processes, records, batch)
+    print(f"{total:,} report lines + {total:,} energy readings, batches of {batch}")
+    print(f"1 process:    {single:.2f} s ({2 * total / single:,.0f} records/s)")
+    print(f"{processes} processes: {many:.2f} s ({2 * total / many:,.0f} records/s, {os.cpu_count()} CPUs)")
+    print("Checks passed: one header, no torn or lost lines, per-writer and time order kept, .bin matches .csv")
+
+if __name__ == "__main__":
+    main()
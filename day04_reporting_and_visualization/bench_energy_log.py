@@ -0,0 +1,50 @@
+# ---------------------------
+# Benchmark: loading energy_log.csv vs the memory-mapped energy_log.bin
+# Run: python bench_energy_log.py [rows]
+# ---------------------------
+
+import os, sys, csv, time, tempfile
+import numpy as np
+
+from energy_log_bin import csv_to_bin, load_log, read_range
+
+def make_csv(path, rows):
+    """A minute-by-minute log in the same format log_energy_usage writes."""
+    ts = np.datetime64("2020-01-01T00:00:00") + np.arange(rows) * np.timedelta64(60, "s")
+    kwh = np.random.default_rng(0).uniform(0, 50, rows).round(2)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("timestamp,kwh\n")
+        stamps = np.datetime_as_string(ts).astype(object)
+        f.writelines(f"{t.replace('T', ' ')},{k}\n" for t, k in zip(stamps, kwh.tolist()))
+
+def load_csv(path):
+    """The way plot_energy_history used to read the log."""
+    timestamps, kwh_values = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            timestamps.append(row["timestamp"])
+            kwh_values.append(float(row["kwh"]))
+    return timestamps, kwh_values
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"{label:<34} {time.perf_counter() - start:8.3f} s")
+    return result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, bin_path = os.path.join(tmp, "energy_log.csv"), os.path.join(tmp, "energy_log.bin")
+        make_csv(csv_path, rows)
+        print(f"Rows: {rows:,}")
+        timed("CSV load (csv.DictReader + float)", load_csv, csv_path)
+        timed("Convert CSV → bin (one time)", csv_to_bin, csv_path, bin_path)
+        log = timed("Binary load (memmap)", load_log, bin_path)
+        timed("Binary load + sum of kWh", lambda: float(load_log(bin_path)["kwh"].sum()))
+        day = timed("Binary range read (one day)", read_range, "2020-06-01 00:00:00", "2020-06-02 00:00:00", bin_path)
+        print(f"Rows in that day: {len(day):,} of {len(log):,}")
+        del log, day  # release the memmaps before the temp dir is removed
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# ---------------------------
+# Benchmark: plotting a 10M-row energy log
+# Resample + LTTB + render to PNG with the Agg backend (no window needed).
+# Run: python bench_plot.py [rows] [raw_rows]
+#   raw_rows: how many points to draw the old way (every point) for comparison
+# ---------------------------
+
+import os, sys, time, tempfile
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from energy_plot import MAX_POINTS, prepare_series
+
+def render(x, y, path):
+    fig = plt.figure()
+    plt.plot(x, y)
+    fig.autofmt_xdate(rotation=45, ha="right")
+    plt.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"{label:<36} {time.perf_counter() - start:8.3f} s")
+    return result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    raw_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    # ~19 years of minute-level readings
+    ts = np.datetime64("2005-01-01T00:00:00") + np.arange(rows) * np.timedelta64(60, "s")
+    kwh = np.random.default_rng(0).gamma(2.0, 0.5, rows)
+
+    print(f"Rows: {rows:,}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for bucket in ("hour", "day", "month", None):
+            x, y, used = timed(f"Resample ({bucket or 'auto'}) + LTTB", prepare_series, ts, kwh, bucket, MAX_POINTS)
+            timed(f"  render {len(x):,} points ({used})", render, x, y, os.path.join(tmp, "agg.png"))
+        timed(f"Old way: render {raw_rows:,} raw points", render, ts[:raw_rows], kwh[:raw_rows], os.path.join(tmp, "raw.png"))
+
+if __name__ == "__main__":
+    main()
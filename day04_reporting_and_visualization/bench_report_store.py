@@ -0,0 +1,61 @@
+# ---------------------------
+# Benchmark: structured report store (reports.db)
+# - inserts N reports in batches (one transaction each) vs a few with a commit per row
+# - "heating loads in one month above 50 kW" from the (kind, ts) index vs
+#   regex-scanning the same history written as report.txt
+# Run: python bench_report_store.py [rows]
+# ---------------------------
+
+import os, re, sys, time, tempfile, datetime
+import numpy as np
+
+from report_store import ReportStore, to_epoch
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    ts = np.sort(rng.integers(to_epoch("2023-01-01"), to_epoch("2025-01-01"), n)).tolist()
+    kinds = rng.choice(["energy_cost", "heating_load", "co2"], n).tolist()
+    values = np.round(rng.uniform(0, 100, n), 2).tolist()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "reports.db")
+        start = time.perf_counter()
+        with ReportStore(db, batch_size=5000, flush_interval=60) as store:
+            for t, kind, value in zip(ts, kinds, values):
+                store.add(kind, None, {"value": value}, value, None, f"{kind} {value:.2f}", t)
+        batched = time.perf_counter() - start
+
+        few = 2000
+        start = time.perf_counter()
+        with ReportStore(os.path.join(tmp, "per_row.db"), batch_size=1) as store:
+            for t, kind, value in zip(ts[:few], kinds[:few], values[:few]):
+                store.add(kind, None, {"value": value}, value, None, f"{kind} {value:.2f}", t)
+        per_row = (time.perf_counter() - start) / few
+
+        txt = os.path.join(tmp, "report.txt")
+        with open(txt, "w", encoding="utf-8") as f:
+            epoch = datetime.datetime(1970, 1, 1)
+            for t, kind, value in zip(ts, kinds, values):
+                stamp = (epoch + datetime.timedelta(seconds=t)).strftime("%Y-%m-%d %H:%M:%S")
+                f.write(f"[{stamp}] {kind} {value:.2f}\n")
+
+        with ReportStore(db) as store:
+            start = time.perf_counter()
+            rows = store.query("heating_load", "2024-05-01", "2024-06-01", min_value=50)
+            indexed = time.perf_counter() - start
+            plan = store.explain("heating_load", "2024-05-01", "2024-06-01", 50)
+
+        start = time.perf_counter()
+        pattern = re.compile(r"\[(2024-05-\d\d [\d:]+)\] heating_load ([\d.]+)")
+        matches = [m for m in map(pattern.match, open(txt, encoding="utf-8")) if m and float(m.group(2)) >= 50]
+        scanned = time.perf_counter() - start
+        assert len(matches) == len(rows)
+
+    print(f"Insert, batched:     {n:,} rows in {batched:.2f} s ({n / batched:,.0f} rows/s)")
+    print(f"Insert, commit/row:  {1 / per_row:,.0f} rows/s (first {few:,} rows)")
+    print(f"Query (index):       {len(rows):,} rows in {indexed * 1000:.1f} ms  [{'; '.join(plan)}]")
+    print(f"Query (regex scan):  {len(matches):,} rows in {scanned * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# ---------------------------
+# Startup-time check for multi_tool_upgrade.py
+# Imports the tool in a fresh interpreter with "python -X importtime" (a few runs,
+# median), prints the total import time and the slowest modules, and exits with
+# status 1 when it's over the budget or when numpy / matplotlib / sqlite3 get imported at
+# startup (they should only load when a chart, report view, binary log or the
+# report database needs them).
+# Run: python bench_startup.py [budget_ms]
+# ---------------------------
+
+import os, sys, subprocess, statistics
+
+BUDGET_MS = 50
+RUNS = 5
+MUST_BE_LAZY = ["numpy", "matplotlib", "sqlite3"]
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def import_times(code):
+    """{module: (cumulative import µs, nested?)} for one fresh "python -X importtime -c code"."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(cumulative), name.startswith("  "))  # nested imports are indented
+    return times
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    baseline = import_times("pass")  # what the interpreter loads anyway (site, encodings, ...)
+    runs = [import_times("import multi_tool_upgrade") for _ in range(RUNS)]
+    totals = [sum(t for name, (t, nested) in run.items() if not nested and name not in baseline) / 1000
+              for run in runs]
+    total = statistics.median(totals)
+
+    print(f"multi_tool_upgrade import time: {total:.1f} ms (median of {RUNS}, budget {budget:.0f} ms)")
+    slowest = sorted(((t, name) for name, (t, _) in runs[-1].items() if name not in baseline), reverse=True)[:5]
+    for t, name in slowest:
+        print(f"  {t / 1000:8.1f} ms  {name}")
+
+    eager = [m for m in MUST_BE_LAZY if m in runs[-1] and m not in baseline]
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+    if total > budget:
+        print("FAIL: over the startup budget")
+    if eager or total > budget:
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# ---------------------------
+# Benchmark + check: pricing interval readings with a time-of-use tariff
+# - 10M random 15-minute-ish readings over a year with tariff_example.json
+# - checks a sample against a plain loop (weekday/hour rules, monthly tiers), and
+#   that a band wrapping past midnight runs into the next day
+# - checks that Day 5's copy of the tariff rules (tariff_costs.py) gives the same
+#   hourly rates and monthly costs as price_monthly(), so the two can't drift
+# - times price() on the whole array and bill() streamed in chunks
+# Run: python bench_tariff.py [rows]
+# ---------------------------
+
+import os, sys, time, json, datetime, importlib.util
+import numpy as np
+
+from tariff import compile_tariff
+from energy_log_bin import to_epoch
+
+def loop_price(tariff_def, ts, kwh):
+    """One reading at a time, straight from the JSON definition."""
+    days = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+    def on_days(spec, weekday):
+        first, _, last = spec.partition("-")
+        a, b = days.index(first), days.index(last or first)
+        return a <= weekday <= b if a <= b else weekday >= a or weekday <= b
+    def in_band(band, weekday, hour):
+        start, end = band["hours"]
+        if start < end:
+            return on_days(band["days"], weekday) and start <= hour < end
+        # wraps past midnight: the early hours belong to the previous day's band
+        return (on_days(band["days"], weekday) and hour >= start) or \
+               (on_days(band["days"], (weekday - 1) % 7) and hour < end)
+    tiers = tariff_def["tiers"] + [{"from_kwh": float("inf")}]
+    month_kwh, costs = {}, []
+    for t, k in zip(ts.tolist(), kwh.tolist()):
+        dt = datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=t)
+        rate = tariff_def["default_rate"]
+        for band in tariff_def["bands"]:
+            if in_band(band, dt.weekday(), dt.hour):
+                rate = band["rate"]
+        before = month_kwh.get((dt.year, dt.month), 0.0)
+        month_kwh[(dt.year, dt.month)] = after = before + k
+        adder = sum(lo["adder"] * max(0.0, min(after, hi["from_kwh"]) - max(before, lo["from_kwh"]))
+                    for lo, hi in zip(tiers, tiers[1:]))
+        costs.append(rate * k + adder)
+    return np.array(costs)
+
+DAY5_TARIFF_COSTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                 "day05_building_portfolio_manager", "tariff_costs.py")
+
+def check_day5_copy(definitions):
+    """Day 5 prices its portfolio with its own copy of the tariff rules; it must agree
+    with this engine. Loaded from its file, since the day folders don't import each other."""
+    spec = importlib.util.spec_from_file_location("tariff_costs", DAY5_TARIFF_COSTS)
+    day5 = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(day5)
+    monthly_kwh = np.array([0.0, 250.0, 999.9, 1000.0, 4321.5])
+    for definition in definitions:
+        tariff = compile_tariff(definition)
+        assert np.array_equal(day5.weekly_rates(definition), tariff.rates), definition.get("name")
+        for days in (28, 30, 31):
+            assert np.allclose(day5.monthly_costs(definition, monthly_kwh, days),
+                               tariff.price_monthly(monthly_kwh, days=days)), definition.get("name")
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    with open("tariff_example.json", "r", encoding="utf-8") as f:
+        tariff_def = json.load(f)
+    rng = np.random.default_rng(0)
+    ts = np.sort(rng.integers(1_704_067_200, 1_735_689_600, n))  # 2024
+    kwh = rng.uniform(0.0, 2.0, n)
+
+    start = time.perf_counter()
+    tariff = compile_tariff(tariff_def)
+    compile_s = time.perf_counter() - start
+    start = time.perf_counter()
+    assert compile_tariff(tariff_def) is tariff
+    cached_s = time.perf_counter() - start
+
+    # a weekday-only night band that wraps past midnight: Friday night runs into
+    # Saturday morning, and Monday's early hours are still Sunday (not in the band)
+    nights_def = {"default_rate": 0.30, "tiers": [],
+                  "bands": [{"name": "night", "rate": 0.15, "days": "mon-fri", "hours": [23, 8]}]}
+    nights = compile_tariff(nights_def)
+    at = lambda day, hour: to_epoch(f"2024-06-{day:02d} {hour:02d}:00:00")  # 2024-06-03 is a Monday
+    assert nights.rate_at([at(7, 23), at(8, 3), at(4, 7)]).tolist() == [0.15, 0.15, 0.15]  # Fri 23:00, Sat 03:00, Tue 07:00
+    assert nights.rate_at([at(3, 3), at(9, 3), at(8, 8)]).tolist() == [0.30, 0.30, 0.30]   # Mon 03:00, Sun 03:00, Sat 08:00
+    week = np.arange(at(3, 0), at(10, 0), 3600)
+    assert np.allclose(nights.price(week, np.ones(len(week))), loop_price(nights_def, week, np.ones(len(week))))
+
+    check_day5_copy([tariff_def, nights_def,
+                     {"name": "lists and tiers", "default_rate": 0.25, "standing_charge_per_day": 0.5,
+                      "bands": [{"name": "a", "rate": 0.1, "days": ["mon", "wed"], "hours": [20, 2]},
+                                {"name": "b", "rate": 0.4, "days": "sat,sun", "hours": [10, 12]},
+                                {"name": "c", "rate": 0.2, "days": "fri-mon", "hours": [0, 24]}],
+                      "tiers": [{"from_kwh": 500, "adder": -0.02}, {"from_kwh": 0, "adder": 0.01},
+                                {"from_kwh": 2000, "adder": 0.05}]}])
+
+    # the sample must start at a month boundary for the loop's running totals to line up
+    first = int(np.searchsorted(ts, 1_717_200_000))  # 2024-06-01
+    sample = slice(first, first + 50_000)
+    expected = loop_price(tariff_def, ts[sample], kwh[sample])
+    assert np.allclose(tariff.price(ts[sample], kwh[sample]), expected)
+
+    start = time.perf_counter()
+    cost = tariff.price(ts, kwh)
+    price_s = time.perf_counter() - start
+    start = time.perf_counter()
+    bill = tariff.bill((ts[i:i + 1_000_000], kwh[i:i + 1_000_000]) for i in range(0, n, 1_000_000))
+    bill_s = time.perf_counter() - start
+    assert np.isclose(bill["energy_cost"] + bill["tier_charges"], cost.sum())
+
+    print(f"Compile: {compile_s * 1000:.2f} ms (cached: {cached_s * 1e6:.1f} µs)")
+    print(f"price(): {n:,} readings in {price_s:.2f} s ({n / price_s / 1e6:,.1f} M readings/s)")
+    print(f"bill():  {n:,} readings in {bill_s:.2f} s ({n / bill_s / 1e6:,.1f} M readings/s, 1M-row chunks)")
+    print(f"Total: {bill['kwh']:,.0f} kWh = €{bill['total']:,.2f} over {bill['days']} days")
+    print("Checks passed (including Day 5's tariff_costs.py against price_monthly)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# ---------------------------
+# Time-varying grid carbon intensity
+# Instead of one fixed factor (0.233 kg CO₂/kWh) for every kWh, each reading in
+# the energy log gets the grid intensity that was in effect at its timestamp:
+# an "as-of" join (latest intensity at or before the reading) done with
+# np.searchsorted on the sorted intensity timestamps, a whole chunk at a time.
+# The log is streamed in chunks (memory-mapped .bin or parsed .csv), so it can
+# be much bigger than memory.
+# Intensity file: CSV "timestamp,g_co2_per_kwh" (e.g. hourly grid data).
+# Time zones: grid operators publish intensity in UTC, but the energy log stores
+# local wall-clock time (what the tool's clock showed, no offset). Intensity
+# timestamps are therefore read as UTC (a "Z" or "+01:00" suffix is honoured)
+# and converted to wall-clock time in the log's zone before the join: tz=None is
+# this computer's zone, which is what the writers used, or pass a zoneinfo name
+# like "Europe/Dublin". Only the small intensity series is converted, not the log.
+# In the hour repeated when clocks go back, the log can't tell the two apart,
+# so those readings get the second hour's intensity.
+# Run: python carbon_intensity.py carbon_intensity.csv [energy_log.bin|.csv] [out.csv]
+# ---------------------------
+
+import os, sys, datetime, zoneinfo
+import numpy as np
+
+from energy_log_bin import ENERGY_LOG_BIN, iter_chunks, to_epoch
+
+CARBON_INTENSITY = "carbon_intensity.csv"
+CHUNK_ROWS = 1_000_000
+
+def wall_clock(stamp, tz=None):
+    """A UTC timestamp string ("2024-05-01T10:00", "...Z" or with an offset) → epoch
+    seconds of the wall-clock time in tz (None = this computer's zone), like the log."""
+    when = datetime.datetime.fromisoformat(stamp.strip())
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    zone = zoneinfo.ZoneInfo(tz) if tz else None
+    return to_epoch(when.astimezone(zone).replace(tzinfo=None))
+
+def load_intensity(path=CARBON_INTENSITY, tz=None):
+    """Read the intensity series → (epoch seconds on the log's wall-clock basis, kg CO₂
+    per kWh), sorted by time. The file's timestamps are UTC; tz is the log's zone."""
+    data = np.loadtxt(path, delimiter=",", skiprows=1, dtype=str, ndmin=2)
+    ts = np.array([wall_clock(stamp, tz) for stamp in data[:, 0]], dtype=np.int64)
+    kg_per_kwh = data[:, 1].astype(np.float64) / 1000.0
+    order = np.argsort(ts, kind="stable")
+    return ts[order], kg_per_kwh[order]
+
+def intensity_at(timestamps, series, fallback=None, max_age=None):
+    """As-of lookup: the intensity in effect at each timestamp (epoch seconds).
+    Readings before the first intensity value, or more than max_age seconds after
+    the last one before them, get `fallback` (NaN if None)."""
+    series_ts, values = series
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    fill = np.nan if fallback is None else fallback
+    if len(values) == 0:
+        return np.full(len(timestamps), fill)
+    idx = np.searchsorted(series_ts, timestamps, side="right") - 1
+    missing = idx < 0
+    idx[missing] = 0
+    result = values[idx]
+    if max_age is not None:
+        missing |= timestamps - series_ts[idx] > max_age
+    result[missing] = fill
+    return result
+
+def co2_for_log(series, log_path=ENERGY_LOG_BIN, out_path=None, chunk_rows=CHUNK_ROWS,
+                fallback=None, max_age=None):
+    """Stream the energy log, join each reading to its intensity and add up kg CO₂.
+    out_path: also write "timestamp,kwh,kg_co2_per_kwh,kg_co2" per reading.
+    Returns totals: readings, kWh, kg CO₂, average intensity and readings without one."""
+    totals = {"readings": 0, "kwh": 0.0, "kg_co2": 0.0, "unmatched": 0}
+    out = open(out_path, "w", encoding="utf-8") if out_path else None
+    try:
+        if out:
+            out.write("timestamp,kwh,kg_co2_per_kwh,kg_co2\n")
+        for ts, kwh in iter_chunks(log_path, chunk_rows):
+            factor = intensity_at(ts, series, fallback, max_age)
+            kg = kwh * factor
+            matched = ~np.isnan(kg)
+            totals["readings"] += len(kwh)
+            totals["unmatched"] += int((~matched).sum())
+            totals["kwh"] += float(kwh[matched].sum())
+            totals["kg_co2"] += float(kg[matched].sum())
+            if out and len(kwh):
+                cells = np.empty((len(kwh), 4), dtype=object)
+                cells[:, 0] = np.char.replace(np.datetime_as_string(ts.astype("datetime64[s]")), "T", " ")
+                cells[:, 1], cells[:, 2], cells[:, 3] = kwh, factor, kg
+                out.write(("%s,%.10g,%.10g,%.10g\n" * len(kwh)) % tuple(cells.ravel().tolist()))
+    finally:
+        if out:
+            out.close()
+    totals["kg_co2_per_kwh"] = totals["kg_co2"] / totals["kwh"] if totals["kwh"] else float("nan")
+    return totals
+
+def current_intensity(path=CARBON_INTENSITY, fallback=None, max_age=86_400, tz=None):
+    """Intensity in effect right now, or fallback when there's no intensity file
+    or its newest value is more than max_age seconds old."""
+    if not os.path.exists(path):
+        return fallback
+    now = datetime.datetime.now(zoneinfo.ZoneInfo(tz) if tz else None).replace(tzinfo=None)
+    value = intensity_at([to_epoch(now)], load_intensity(path, tz), fallback, max_age)[0]
+    return float(value)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python carbon_intensity.py carbon_intensity.csv [energy_log.bin|energy_log.csv] [out.csv]")
+        sys.exit(1)
+    log_path = sys.argv[2] if len(sys.argv) > 2 else ENERGY_LOG_BIN
+    out_path = sys.argv[3] if len(sys.argv) > 3 else None
+    totals = co2_for_log(load_intensity(sys.argv[1]), log_path, out_path)
+    print(f"Readings: {totals['readings']:,} ({totals['unmatched']:,} before the first intensity value, skipped)")
+    print(f"Energy: {totals['kwh']:,.2f} kWh")
+    print(f"CO₂: {totals['kg_co2']:,.2f} kg (average {totals['kg_co2_per_kwh'] * 1000:.0f} g/kWh)")
+    if out_path:
+        print(f"Per-reading results written to {out_path}")
@@ -0,0 +1,102 @@
+# ---------------------------
+# Batch mode for the Building Engineering Tool
+# Runs the calculators over a whole CSV (or .npy) file in chunks
+# instead of one typed-in value at a time.
+# ---------------------------
+
+import argparse, itertools
+import numpy as np
+
+from multi_tool_upgrade import calc_energy_cost, calc_heating_load, calc_co2, kwh_to_mj
+
+def _watts_and_kw(load_watts):
+    return load_watts, load_watts / 1000
+
+# ---------------------------
+# Calculator table: input columns, output columns, and the math
+# ---------------------------
+CALCS = {
+    "energy": {
+        "inputs": ("kwh", "cost_per_kwh"),
+        "outputs": ("cost_eur", "energy_mj"),
+        "func": lambda kwh, rate: (calc_energy_cost(kwh, rate), kwh_to_mj(kwh)),
+    },
+    "heating": {
+        "inputs": ("area", "u_value", "temp_diff"),
+        "outputs": ("load_w", "load_kw"),
+        "func": lambda area, u, dt: _watts_and_kw(calc_heating_load(area, u, dt)),
+    },
+    "co2": {
+        "inputs": ("kwh",),
+        "outputs": ("co2_kg", "energy_mj"),
+        "func": lambda kwh: (calc_co2(kwh), kwh_to_mj(kwh)),
+    },
+}
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+# ---------------------------
+# Readers: yield 2-D float arrays (rows × input columns)
+# ---------------------------
+def iter_csv_chunks(path, columns, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream a CSV with a header row, yielding the named columns chunk by chunk."""
+    with open(path, "r", encoding="utf-8") as f:
+        header = [h.strip() for h in f.readline().split(",")]
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise ValueError(f"{path} is missing column(s): {', '.join(missing)}")
+        usecols = [header.index(c) for c in columns]
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                break
+            yield np.loadtxt(lines, delimiter=",", usecols=usecols, ndmin=2, dtype=np.float64)
+
+def iter_npy_chunks(path, columns, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream a 2-D .npy array whose columns are already in calculator input order."""
+    data = np.load(path, mmap_mode="r")
+    if data.ndim != 2 or data.shape[1] != len(columns):
+        raise ValueError(f"{path} must be a 2-D array with columns: {', '.join(columns)}")
+    for start in range(0, data.shape[0], chunk_rows):
+        yield np.asarray(data[start:start + chunk_rows], dtype=np.float64)
+
+# ---------------------------
+# Writer: one big string format per chunk (much faster than np.savetxt's row loop)
+# ---------------------------
+def write_rows(out, rows):
+    """Append a 2-D float array to an open text file as CSV lines."""
+    if rows.size == 0:
+        return
+    line = ",".join(["%.10g"] * rows.shape[1]) + "\n"
+    out.write((line * rows.shape[0]) % tuple(rows.ravel().tolist()))
+
+# ---------------------------
+# Batch runner
+# ---------------------------
+def run_batch(calc, in_path, out_path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Run one calculator over in_path and write inputs + results to out_path as CSV.
+    Returns the number of rows processed."""
+    spec = CALCS[calc]
+    reader = iter_npy_chunks if in_path.endswith(".npy") else iter_csv_chunks
+    rows = 0
+    with open(out_path, "w", newline="", encoding="utf-8") as out:
+        out.write(",".join(spec["inputs"] + spec["outputs"]) + "\n")
+        for chunk in reader(in_path, spec["inputs"], chunk_rows):
+            results = spec["func"](*chunk.T)
+            write_rows(out, np.column_stack((chunk, *results)))
+            rows += chunk.shape[0]
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Building Engineering calculator over a whole file.")
+    parser.add_argument("calc", choices=sorted(CALCS), help="which calculator to run")
+    parser.add_argument("input", help="input .csv (with header) or .npy file")
+    parser.add_argument("output", help="output .csv file")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows per chunk")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.calc, args.input, args.output, args.chunk_rows)
+    print(f"Processed {rows:,} rows → {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# ---------------------------
+# Binary energy log
+# Same data as energy_log.csv (timestamp + kWh) but stored as fixed-width
+# 16-byte records: int64 seconds since 1970 + float64 kWh.
+# - appending a reading is one small write at the end of the file
+# - loading is a numpy.memmap (no parsing, pages are read on demand)
+# - time-range reads binary-search the timestamp column
+# Timestamps are the same naive local wall-clock times the CSV uses.
+# ---------------------------
+
+import os, sys, datetime, itertools
+import numpy as np
+
+ENERGY_LOG_BIN = "energy_log.bin"
+RECORD = np.dtype([("ts", "<i8"), ("kwh", "<f8")])
+
+# ---------------------------
+# Timestamp helpers
+# ---------------------------
+def to_epoch(ts):
+    """datetime / "YYYY-MM-DD HH:MM:SS" string / datetime64 → int64 seconds."""
+    return int(np.datetime64(ts, "s").astype(np.int64))
+
+def to_datetime64(epochs):
+    """int64 seconds → datetime64[s] (works on whole arrays)."""
+    return np.asarray(epochs, dtype=np.int64).astype("datetime64[s]")
+
+# ---------------------------
+# Writing
+# ---------------------------
+def append_readings(timestamps, kwh_values, path=ENERGY_LOG_BIN):
+    """Append many readings in one write. timestamps are epoch seconds (int64)."""
+    records = np.empty(len(kwh_values), dtype=RECORD)
+    records["ts"] = timestamps
+    records["kwh"] = kwh_values
+    with open(path, "ab") as f:
+        f.write(records.tobytes())
+
+def append_reading(kwh, ts=None, path=ENERGY_LOG_BIN):
+    """Append one reading (defaults to now)."""
+    ts = datetime.datetime.now() if ts is None else ts
+    append_readings([to_epoch(ts)], [kwh], path)
+
+# ---------------------------
+# Reading
+# ---------------------------
+def load_log(path=ENERGY_LOG_BIN):
+    """Memory-map the whole log as a record array with "ts" and "kwh" fields."""
+    if not os.path.exists(path) or os.path.getsize(path) < RECORD.itemsize:
+        return np.empty(0, dtype=RECORD)
+    count = os.path.getsize(path) // RECORD.itemsize  # ignore a half-written last record
+    return np.memmap(path, dtype=RECORD, mode="r", shape=(count,))
+
+def read_range(start=None, end=None, path=ENERGY_LOG_BIN):
+    """Readings with start <= timestamp < end (either bound may be None).
+    Uses a binary search on the timestamp column, so only the matching
+    slice of the file is actually read."""
+    log = load_log(path)
+    ts = log["ts"]
+    lo = 0 if start is None else int(np.searchsorted(ts, to_epoch(start), side="left"))
+    hi = len(log) if end is None else int(np.searchsorted(ts, to_epoch(end), side="left"))
+    return log[lo:hi]
+
+# ---------------------------
+# Converter from the existing CSV
+# ---------------------------
+def _parse_floats(strings):
+    """Strings → float64, bad values become NaN (same rule plot_energy_history used)."""
+    try:
+        return np.asarray(strings, dtype=np.float64)
+    except ValueError:
+        values = np.empty(len(strings), dtype=np.float64)
+        for i, s in enumerate(strings):
+            try:
+                values[i] = float(s)
+            except ValueError:
+                values[i] = np.nan
+        return values
+
+def _parse_timestamps(strings):
+    """Strings → datetime64[s], values that aren't a date (e.g. a repeated header line) become NaT."""
+    try:
+        return np.array(strings, dtype="datetime64[s]")
+    except ValueError:
+        stamps = np.full(len(strings), np.datetime64("NaT"), dtype="datetime64[s]")
+        for i, s in enumerate(strings):
+            try:
+                stamps[i] = np.datetime64(s, "s")
+            except ValueError:
+                pass
+        return stamps
+
+def iter_csv_chunks(csv_path="energy_log.csv", chunk_rows=100_000):
+    """Stream energy_log.csv as (int64 epoch seconds, float64 kWh) array pairs,
+    chunk_rows lines at a time. Rows whose timestamp isn't a date or whose kWh
+    isn't a number are skipped."""
+    with open(csv_path, "r", encoding="utf-8") as f:
+        f.readline()  # header
+        while True:
+            chunk = list(itertools.islice(f, chunk_rows))
+            if not chunk:
+                break
+            lines = [parts for parts in (line.rstrip("\r\n").split(",", 1) for line in chunk) if len(parts) == 2]
+            if not lines:
+                continue
+            ts_strings, kwh_strings = zip(*lines)
+            kwh = _parse_floats(kwh_strings)
+            stamps = _parse_timestamps(ts_strings)
+            keep = ~np.isnan(kwh) & ~np.isnat(stamps)
+            yield stamps[keep].astype(np.int64), kwh[keep]
+
+def iter_chunks(path, chunk_rows=1_000_000):
+    """(epoch seconds, kWh) chunks from either log format: the .bin file is
+    memory-mapped and sliced, the CSV is parsed chunk by chunk."""
+    if path.endswith(".bin"):
+        log = load_log(path)
+        for start in range(0, len(log), chunk_rows):
+            part = log[start:start + chunk_rows]
+            yield np.asarray(part["ts"]), np.asarray(part["kwh"])
+    else:
+        yield from iter_csv_chunks(path, chunk_rows)
+
+def csv_to_bin(csv_path="energy_log.csv", bin_path=ENERGY_LOG_BIN, chunk_rows=100_000):
+    """Convert energy_log.csv into the binary format (overwrites bin_path).
+    Rows without a valid timestamp and kWh are skipped. Returns the number of rows written.
+    The file is built next to bin_path and renamed over it when complete, so a
+    failed conversion never leaves a partial binary log behind."""
+    written = 0
+    tmp_path = bin_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as out:
+            for ts, kwh in iter_csv_chunks(csv_path, chunk_rows):
+                records = np.empty(len(kwh), dtype=RECORD)
+                records["ts"] = ts
+                records["kwh"] = kwh
+                out.write(records.tobytes())
+                written += len(records)
+        os.replace(tmp_path, bin_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "energy_log.csv"
+    dst = sys.argv[2] if len(sys.argv) > 2 else ENERGY_LOG_BIN
+    print(f"Converted {csv_to_bin(src, dst):,} readings → {dst}")
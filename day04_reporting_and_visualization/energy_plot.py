@@ -0,0 +1,142 @@
+# ---------------------------
+# Helpers to plot big energy logs quickly
+# - resample(): add up kWh per hour / day / month bucket (vectorized)
+# - lttb(): Largest-Triangle-Three-Buckets downsampling, keeps the visual
+#   shape of a line while capping the number of points that get drawn
+# - headless charts: draw on a plain Figure and save PNG/SVG in a background
+#   process, so nothing blocks and no display is needed; matplotlib is only
+#   imported when a chart is actually drawn
+# ---------------------------
+
+import os, sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+
+MAX_POINTS = 2000  # about one point per horizontal pixel on a wide screen
+BUCKETS = {"hour": "h", "day": "D", "month": "M"}
+_SECONDS_PER_BUCKET = {"hour": 3600, "day": 86_400, "month": 2_629_746}
+
+def parse_timestamps(strings):
+    """"YYYY-MM-DD HH:MM:SS" strings → datetime64[s] array in one call."""
+    return np.array(strings, dtype="datetime64[s]")
+
+def resample(timestamps, kwh, bucket="day"):
+    """Total kWh per bucket ("hour", "day" or "month").
+    Returns (bucket start times as datetime64, kWh totals)."""
+    keys = np.asarray(timestamps).astype(f"datetime64[{BUCKETS[bucket]}]")
+    kwh = np.asarray(kwh, dtype=np.float64)
+    if len(keys) == 0:
+        return keys, kwh
+    if np.any(keys[1:] < keys[:-1]):  # the log is normally already in time order
+        order = np.argsort(keys, kind="stable")
+        keys, kwh = keys[order], kwh[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(kwh, starts)
+
+def auto_bucket(timestamps, max_points=MAX_POINTS):
+    """Pick the finest bucket that keeps roughly 10× max_points buckets or fewer
+    (None when the raw data is already small enough)."""
+    if len(timestamps) <= max_points:
+        return None
+    ts = np.asarray(timestamps).astype("datetime64[s]").astype(np.int64)
+    span = ts.max() - ts.min()
+    for bucket in ("hour", "day"):
+        if span / _SECONDS_PER_BUCKET[bucket] <= 10 * max_points:
+            return bucket
+    return "month"
+
+def lttb(x, y, max_points=MAX_POINTS):
+    """Downsample a line to max_points points with Largest-Triangle-Three-Buckets.
+    x may be numbers or datetime64. Returns (x, y) subsets of the input."""
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return x, y
+    xf = x.astype("datetime64[s]").astype(np.float64) if np.issubdtype(x.dtype, np.datetime64) else x.astype(np.float64)
+
+    # first and last points are always kept; the rest is split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = xf[hi:next_hi].mean(), y[hi:next_hi].mean()
+        # twice the triangle area between the previous kept point, each candidate and the next bucket's average
+        area = np.abs((xf[a] - avg_x) * (y[lo:hi] - y[a]) - (xf[a] - xf[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+def prepare_series(timestamps, kwh, bucket=None, max_points=MAX_POINTS):
+    """Resample (auto-picking the bucket when None) then LTTB-downsample.
+    Returns (x, y, bucket used)."""
+    timestamps = np.asarray(timestamps).astype("datetime64[s]")
+    bucket = bucket or auto_bucket(timestamps, max_points)
+    if bucket is not None:
+        timestamps, kwh = resample(timestamps, kwh, bucket)
+    x, y = lttb(timestamps, kwh, max_points)
+    return x, y, bucket
+
+# ---------------------------
+# Headless charts
+# ---------------------------
+NON_INTERACTIVE = {"agg", "svg", "pdf", "ps", "cairo", "pgf", "template"}
+
+def is_headless():
+    """True when no chart window can be opened (MPLBACKEND=Agg etc., or no display on Linux)."""
+    backend = os.environ.get("MPLBACKEND", "").lower()
+    if backend:
+        return backend in NON_INTERACTIVE
+    return sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+def draw_energy_history(fig, x, y, bucket=None):
+    """kWh over time on an existing Figure."""
+    ax = fig.add_subplot()
+    ax.plot(x, y, marker="o" if len(x) <= 100 else None)
+    ax.set_title("Energy Usage History" + (f" (kWh per {bucket})" if bucket else ""))
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel("kWh")
+    fig.autofmt_xdate(rotation=45, ha="right")
+    fig.tight_layout()
+
+def save_energy_history(path, x, y, bucket=None):
+    """Render the chart straight to a file; the format comes from the extension (.png, .svg, ...)."""
+    from matplotlib.figure import Figure  # a bare Figure saves through Agg, no GUI backend involved
+    fig = Figure()
+    draw_energy_history(fig, x, y, bucket)
+    fig.savefig(path)
+    return path
+
+class ChartWriter:
+    """Saves charts in the background: one worker process by default
+    (the function and arguments must be picklable), or a thread.
+    Failures are reported in close(), in submit order. The ETH predictor's
+    timeline_chart.py has a copy of this class; keep the two the same."""
+
+    def __init__(self, processes=True):
+        self.processes = processes
+        self._pool = None
+        self.pending = []
+
+    def submit(self, func, *args):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(1) if self.processes else ThreadPoolExecutor(1)
+        future = self._pool.submit(func, *args)
+        self.pending.append(future)
+        return future
+
+    def close(self):
+        """Wait for the charts still being written; returns the saved paths."""
+        paths = []
+        for future in self.pending:
+            try:
+                paths.append(future.result())
+            except Exception as e:
+                print(f"Chart failed: {e}")
+        self.pending = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        return paths
@@ -2,29 +2,105 @@
 # Building Engineering Tool
 # ---------------------------
 
-# Imports for chart and file handling
-import os, csv, datetime
-import matplotlib.pyplot as plt
+# Imports for file handling
+# The numpy / matplotlib helpers (energy_log_bin, energy_plot, report_view) are
+# imported inside the functions that use them, so a quick calculation starts fast.
+import os, sys, csv, datetime
+from writers import ReportWriter, EnergyLogWriter, ENERGY_LOG_BIN
 
 # ---------------------------
 # Report generator
 # ---------------------------
-def save_report(text):
-    """Append a timestamped line to report.txt"""
-    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open("report.txt", "a", encoding="utf-8") as f:
-        f.write(f"[{ts}] {text}\n")
+report_writer = ReportWriter("report.txt")  # keeps report.txt open and writes lines in batches
+
+REPORT_DB = "reports.db"  # the same reports as typed, indexed rows (see report_store.py)
+report_store = None       # report_store.ReportStore, opened on the first save or search
+
+def open_report_store():
+    """Open reports.db and import the existing report.txt into it, once
+    (import_report_txt skips it when it's already in the imports table)."""
+    global report_store
+    if report_store is None:
+        from report_store import ReportStore
+        # one calculation at a time: commit each row so other tools see it at once and a crash can't lose it
+        report_store = ReportStore(REPORT_DB, batch_size=1)
+        report_writer.flush()
+        report_store.import_report_txt("report.txt")
+    return report_store
+
+def save_report(text, kind=None, inputs=None, outputs=None, value=None, unit=None):
+    """Append a timestamped line to report.txt, and a structured row to reports.db
+    when the calculation type (kind) is given"""
+    if kind is not None:
+        open_report_store().add(kind, inputs, outputs, value, unit, text)
+    report_writer.write(text)
+
+REPORT_PAGE_SIZE = 20
 
 def view_report():
-    """Print the report (or say if it doesn't exist yet)"""
+    """Print the report (or say if it doesn't exist yet).
+    Big reports are never read in one go: last N and paging seek straight to the lines."""
+    report_writer.flush()
     if not os.path.exists("report.txt"):
         print("No report yet. Run a calculation first.")
         return
+    from report_view import tail, count_entries, read_entries, entries_between
+    print("1. Last 20 entries")
+    print("2. Page through the report")
+    print("3. Entries between two dates")
+    print("4. Everything")
+    print("5. Search by type, dates and value")
+    mode = ask_menu("Choose a view (1-5): ", ("1","2","3","4","5"))
+
     print("\n--- Report History ---")
-    with open("report.txt", "r", encoding="utf-8") as f:
-        print(f.read())
+    if mode == "1":
+        print("\n".join(tail("report.txt", REPORT_PAGE_SIZE)))
+    elif mode == "2":
+        total = count_entries("report.txt")
+        start = 0
+        while start < total:
+            print("\n".join(read_entries("report.txt", start, REPORT_PAGE_SIZE)))
+            start += REPORT_PAGE_SIZE
+            if start < total and input(f"-- {start}/{total} -- Enter for more, q to stop: ").strip().lower() == "q":
+                break
+    elif mode == "3":
+        start = input("From (YYYY-MM-DD, blank = beginning): ").strip() or None
+        end = input("Until (YYYY-MM-DD, blank = now): ").strip() or None
+        try:
+            print("\n".join(entries_between("report.txt", start, through_day(end))))
+        except ValueError:
+            print("X Please enter dates like 2024-05-31")
+    elif mode == "5":
+        search_reports()
+    else:
+        with open("report.txt", "r", encoding="utf-8") as f:
+            for line in f:
+                print(line, end="")
     print("--- End ---\n")
 
+def through_day(until):
+    """An "Until" answer → exclusive upper bound: a date alone means up to the end of that day."""
+    if until is None or len(until) > 10:
+        return until
+    return (datetime.date.fromisoformat(until) + datetime.timedelta(days=1)).isoformat()
+
+REPORT_KINDS = {"1": ("energy_cost", "€"), "2": ("heating_load", "kW"), "3": ("co2", "kg CO₂")}
+
+def search_reports():
+    """e.g. "all heating loads last month above 50 kW", answered from reports.db's indexes."""
+    kind, unit = REPORT_KINDS[ask_menu("Type - 1 energy cost, 2 heating load, 3 CO₂ (1-3): ", ("1","2","3"))]
+    start = input("From (YYYY-MM-DD, blank = beginning): ").strip() or None
+    end = input("Until (YYYY-MM-DD, blank = now): ").strip() or None
+    above = input(f"At least how many {unit} (blank = any): ").strip()
+    try:
+        rows = open_report_store().query(kind, start, through_day(end), float(above) if above else None)
+    except ValueError:
+        print("X Please enter dates like 2024-05-31 and a number like 50")
+        return
+    for r in rows:
+        print(f"[{r['time']}] {r['text']}")
+    print(f"{len(rows)} matching entries")
+
 # ---------------------------
 # number check
 # ---------------------------
@@ -49,64 +125,118 @@ def kwh_to_mj(kwh): return kwh * 3.6
 def kw_to_btuhr(kw): return kw * 3412.142
 def c_to_f(c): return (c * 9/5) + 32
 
+# ---------------------------
+# Pure calculations (no input/print, so they work on
+# single numbers or whole NumPy arrays for batch mode)
+# ---------------------------
+EMISSION_FACTOR_ELECTRICITY = 0.233  # kg CO₂ per kWh
+
+def calc_energy_cost(energy_used, cost_per_kwh):
+    """Total cost in € for the energy used."""
+    return energy_used * cost_per_kwh
+
+def calc_heating_load(area, u_value, temp_diff):
+    """Heating load in watts: area × U-value × ΔT."""
+    return area * u_value * temp_diff
+
+def calc_co2(energy_used, factor=EMISSION_FACTOR_ELECTRICITY):
+    """CO₂ emissions in kg for the energy used."""
+    return energy_used * factor
+
 # ---------------------------
 # CSV Logging for charting
 # ---------------------------
 ENERGY_LOG = "energy_log.csv"
 
+energy_log_writer = EnergyLogWriter(ENERGY_LOG, ENERGY_LOG_BIN)
+
 def log_energy_usage(kwh):
-    """Append a timestamp + kWh to energy_log.csv (creates file with header if missing)."""
-    new_file = not os.path.exists(ENERGY_LOG)
-    with open(ENERGY_LOG, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if new_file:
-            w.writerow(["timestamp", "kwh"])
-        ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        w.writerow([ts, kwh])
-
-def plot_energy_history():
-    """Read energy_log.csv and plot kWh over time."""
-    if not os.path.exists(ENERGY_LOG):
+    """Append a timestamp + kWh to energy_log.csv (creates file with header if missing)
+    and to the binary copy in energy_log.bin (see energy_log_bin.py)."""
+    energy_log_writer.log(kwh)
+
+ENERGY_CHART = "energy_history.png"
+
+chart_writer = None  # energy_plot.ChartWriter, created for the first headless chart
+
+def close_charts():
+    """Wait for charts still being saved in the background."""
+    if chart_writer is not None:
+        for path in chart_writer.close():
+            print(f"Chart saved to {path}")
+
+def plot_energy_history(bucket=None, save_to=None):
+    """Plot kWh over time (from the memory-mapped binary log when there is one).
+    Long logs are added up per hour/day/month (bucket=None picks one) and
+    downsampled so the chart never draws more than MAX_POINTS points.
+    With save_to, or when there is no display, the chart is saved to a PNG/SVG
+    file by a background process instead of opening a window."""
+    global chart_writer
+    from energy_log_bin import load_log, to_datetime64
+    from energy_plot import (MAX_POINTS, parse_timestamps, prepare_series,
+                             ChartWriter, draw_energy_history, is_headless, save_energy_history)
+    energy_log_writer.flush()
+    if os.path.exists(ENERGY_LOG_BIN):
+        log = load_log(ENERGY_LOG_BIN)
+        timestamps, kwh_values = to_datetime64(log["ts"]), log["kwh"]
+    elif os.path.exists(ENERGY_LOG):
+        timestamps, kwh_values = [], []
+        with open(ENERGY_LOG, "r", encoding="utf-8") as f:
+            r = csv.DictReader(f)
+            for row in r:
+                try:
+                    kwh_values.append(float(row["kwh"]))
+                except ValueError:
+                    continue
+                timestamps.append(row["timestamp"])
+        timestamps = parse_timestamps(timestamps)
+    else:
         print("No energy log yet. Run the Energy Cost Calculator first.")
         return
 
-    timestamps, kwh_values = [], []
-    with open(ENERGY_LOG, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            timestamps.append(row["timestamp"])
-            try:
-                kwh_values.append(float(row["kwh"]))
-            except ValueError:
-                pass
-
-    if not kwh_values:
+    if len(kwh_values) == 0:
         print("Log exists but has no valid data yet.")
         return
 
-    plt.figure()
-    plt.plot(timestamps, kwh_values, marker="o")
-    plt.title("Energy Usage History")
-    plt.xlabel("Timestamp")
-    plt.ylabel("kWh")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    plt.show()
+    x, y, bucket = prepare_series(timestamps, kwh_values, bucket, MAX_POINTS)
+
+    if save_to is None and not is_headless():
+        import matplotlib.pyplot as plt
+        draw_energy_history(plt.figure(), x, y, bucket)
+        plt.show()
+        return
+
+    path = save_to or ENERGY_CHART
+    chart_writer = chart_writer or ChartWriter()
+    chart_writer.submit(save_energy_history, path, x, y, bucket)
+    print(f"Saving chart to {path} in the background.")
 
 # ---------------------------
 # Function #1: Energy cost calculator
 # ---------------------------
+TARIFF_FILE = "tariff.json"  # time-of-use tariff (see tariff.py / tariff_example.json)
+
 def energy_cost():
     energy_used = ask_float("Enter energy used in kWh: ")
-    cost_per_kwh = ask_float("Enter cost per kWh in euros: ")
+    if os.path.exists(TARIFF_FILE):  # rate for the current hour from the tariff
+        import calendar, datetime
+        from tariff import load_tariff
+        tariff = load_tariff(TARIFF_FILE)
+        hour = tariff.hour_of_week([calendar.timegm(datetime.datetime.now().timetuple())])[0]
+        cost_per_kwh = float(tariff.rates[hour])
+        print(f"Tariff {tariff.name}: {tariff.band_names[tariff.band_of_hour[hour]]} rate €{cost_per_kwh:.4f}/kWh")
+    else:
+        cost_per_kwh = ask_float("Enter cost per kWh in euros: ")
 
-    total_cost = energy_used * cost_per_kwh
+    total_cost = calc_energy_cost(energy_used, cost_per_kwh)
     energy_mj = kwh_to_mj(energy_used)
 
     print(f"Energy used: {energy_used:.2f} kWh ({energy_mj:.2f} MJ)")
     print(f"Total energy cost: €{total_cost:.2f}")
 
-    save_report(f"Energy Cost — {energy_used:.2f} kWh ({energy_mj:.2f} MJ), €{total_cost:.2f}")
+    save_report(f"Energy Cost — {energy_used:.2f} kWh ({energy_mj:.2f} MJ), €{total_cost:.2f}",
+                "energy_cost", {"energy_kwh": energy_used, "cost_per_kwh": cost_per_kwh},
+                {"energy_mj": energy_mj, "cost_eur": total_cost}, total_cost, "EUR")
     log_energy_usage(energy_used)
 
     print("Logged energy usage for charting.")
@@ -119,51 +249,97 @@ def heating_load():
     u_value = ask_float("Enter average U-value (W/m²·K): ")
     temp_diff = ask_float("Enter temperature difference (inside - outside, °C): ")
 
-    load_watts = area * u_value * temp_diff
+    load_watts = calc_heating_load(area, u_value, temp_diff)
 
     print(f"ΔT: {temp_diff:.2f} °C ({c_to_f(temp_diff):.2f} °F)")
     print(f"Estimated heating load: {load_watts / 1000:.2f} kW")
-    save_report(f"Heating Load — Area {area:.2f} m², ΔT {temp_diff:.2f} °C, {load_watts:.2f} kW")
+    save_report(f"Heating Load — Area {area:.2f} m², ΔT {temp_diff:.2f} °C, {load_watts:.2f} kW",
+                "heating_load", {"area_m2": area, "u_value": u_value, "temp_diff_c": temp_diff},
+                {"load_w": load_watts, "load_kw": load_watts / 1000}, load_watts / 1000, "kW")
 
 # ---------------------------
 # Function #3: CO₂ emissions calculator
 # ---------------------------
+CARBON_INTENSITY = "carbon_intensity.csv"  # hourly grid intensity (see carbon_intensity.py)
+
 def co2_emissions():
-    Emission_factor_electricity = 0.233
     energy_used = ask_float("Enter energy used in kWh: ")
 
-    emissions = energy_used * Emission_factor_electricity
+    factor = EMISSION_FACTOR_ELECTRICITY
+    if os.path.exists(CARBON_INTENSITY):  # use the grid intensity for the current hour
+        from carbon_intensity import current_intensity
+        factor = current_intensity(CARBON_INTENSITY, EMISSION_FACTOR_ELECTRICITY)
+    emissions = calc_co2(energy_used, factor)
 
     print(f"Energy: {energy_used:.2f} kWh ({kwh_to_mj(energy_used):.2f} MJ)")
-    print(f"Estimated CO₂ emissions: {emissions:.2f} kg")
-    save_report(f"CO₂ — {energy_used:.2f} kWh ({kwh_to_mj(energy_used):.2f} MJ), {emissions:.2f} kg")
+    print(f"Estimated CO₂ emissions: {emissions:.2f} kg ({factor * 1000:.0f} g CO₂/kWh)")
+    save_report(f"CO₂ — {energy_used:.2f} kWh ({kwh_to_mj(energy_used):.2f} MJ), {emissions:.2f} kg",
+                "co2", {"energy_kwh": energy_used, "kg_co2_per_kwh": factor},
+                {"energy_mj": kwh_to_mj(energy_used), "co2_kg": emissions}, emissions, "kg")
 
 # ---------------------------
 # Main program loop
 # ---------------------------
-while True:
-    print("\nBuilding Engineering Tool")
-    print("1. Energy Cost Calculator")
-    print("2. Heating Load Estimator")
-    print("3. CO₂ Emissions Calculator")
-    print("4. View report")
-    print("5. Plot energy history")
-    print("6. Exit")
-
-    choice = input("Choose an option (1-6): ")
-
-    if choice == "1":
-        energy_cost()
-    elif choice == "2":
-        heating_load()
-    elif choice == "3":
-        co2_emissions()
-    elif choice == "4":
-        view_report()
-    elif choice == "5":
-        plot_energy_history()
-    elif choice == "6":
-        print("Goodbye!")
-        break
+def main():
+    while True:
+        print("\nBuilding Engineering Tool")
+        print("1. Energy Cost Calculator")
+        print("2. Heating Load Estimator")
+        print("3. CO₂ Emissions Calculator")
+        print("4. View report")
+        print("5. Plot energy history")
+        print("6. Exit")
+
+        choice = input("Choose an option (1-6): ")
+
+        if choice == "1":
+            energy_cost()
+        elif choice == "2":
+            heating_load()
+        elif choice == "3":
+            co2_emissions()
+        elif choice == "4":
+            view_report()
+        elif choice == "5":
+            plot_energy_history()
+        elif choice == "6":
+            close_charts()
+            print("Goodbye!")
+            break
+        else:
+            print("Invalid choice, please try again.")
+
+if __name__ == "__main__":
+    # "python multi_tool_upgrade.py batch ..." runs the calculators over a whole file
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from energy_batch import main as batch_main
+        batch_main(sys.argv[2:])
+    # "python multi_tool_upgrade.py carbon [intensity.csv] [out.csv]" CO₂ for the whole energy log
+    elif len(sys.argv) > 1 and sys.argv[1] == "carbon":
+        from carbon_intensity import co2_for_log, load_intensity
+        energy_log_writer.flush()
+        log_path = ENERGY_LOG_BIN if os.path.exists(ENERGY_LOG_BIN) else ENERGY_LOG
+        totals = co2_for_log(load_intensity(sys.argv[2] if len(sys.argv) > 2 else CARBON_INTENSITY),
+                             log_path, sys.argv[3] if len(sys.argv) > 3 else None,
+                             fallback=EMISSION_FACTOR_ELECTRICITY)
+        print(f"{totals['readings']:,} readings, {totals['kwh']:,.2f} kWh → {totals['kg_co2']:,.2f} kg CO₂ "
+              f"(average {totals['kg_co2_per_kwh'] * 1000:.0f} g/kWh)")
+    # "python multi_tool_upgrade.py bill [tariff.json]" prices the whole energy log with the tariff
+    elif len(sys.argv) > 1 and sys.argv[1] == "bill":
+        from energy_log_bin import iter_chunks
+        from tariff import load_tariff
+        energy_log_writer.flush()
+        tariff = load_tariff(sys.argv[2] if len(sys.argv) > 2 else TARIFF_FILE)
+        bill = tariff.bill(iter_chunks(ENERGY_LOG_BIN if os.path.exists(ENERGY_LOG_BIN) else ENERGY_LOG))
+        for band, kwh in bill["kwh_by_band"].items():
+            if kwh:
+                print(f"  {band:<10} {kwh:12,.2f} kWh  €{bill['cost_by_band'][band]:12,.2f}")
+        print(f"{bill['kwh']:,.2f} kWh → €{bill['total']:,.2f} (tiers €{bill['tier_charges']:,.2f}, "
+              f"standing charge €{bill['standing_charge']:,.2f} for {bill['days']} days)")
+    # "python multi_tool_upgrade.py plot [file.png|file.svg] [hour|day|month]" saves the chart, no window
+    elif len(sys.argv) > 1 and sys.argv[1] == "plot":
+        plot_energy_history(sys.argv[3] if len(sys.argv) > 3 else None,
+                            sys.argv[2] if len(sys.argv) > 2 else ENERGY_CHART)
+        close_charts()
     else:
-        print("Invalid choice, please try again.")
+        main()
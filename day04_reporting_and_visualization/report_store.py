@@ -0,0 +1,234 @@
+# ---------------------------
+# Structured report store (SQLite, standard library)
+# report.txt is free text, so questions like "all heating loads last month
+# above 50 kW" mean regex-scanning the whole file. Here every calculation is
+# one row with typed columns:
+#   ts      INTEGER  epoch seconds (local time, like energy_log.bin)
+#   kind    TEXT     "energy_cost", "heating_load", "co2", ...
+#   value   REAL     the headline result (€, kW, kg CO₂) in `unit`
+#   inputs  TEXT     JSON of the inputs, outputs TEXT: JSON of all results
+# with indexes on ts and (kind, ts), so a query only touches matching rows.
+# WAL mode lets readers run while a calculation is being saved; inserts are
+# buffered and written in one transaction per batch.
+# Run: python report_store.py import [report.txt]
+#      python report_store.py query heating_load [from] [until] [min_value]
+# ---------------------------
+
+import io, os, re, sys, json, time, atexit, sqlite3, calendar, datetime
+
+REPORT_DB = "reports.db"
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id      INTEGER PRIMARY KEY,
+    ts      INTEGER NOT NULL,
+    kind    TEXT    NOT NULL,
+    value   REAL,
+    unit    TEXT,
+    inputs  TEXT,
+    outputs TEXT,
+    text    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_ts ON reports (ts);
+CREATE INDEX IF NOT EXISTS idx_reports_kind_ts ON reports (kind, ts);
+CREATE TABLE IF NOT EXISTS imports (
+    path        TEXT PRIMARY KEY,
+    imported_at INTEGER NOT NULL,
+    rows        INTEGER NOT NULL
+);
+"""
+
+COLUMNS = ("id", "ts", "kind", "value", "unit", "inputs", "outputs", "text")
+
+def to_epoch(when):
+    """datetime, date or "YYYY-MM-DD[ HH:MM:SS]" → epoch seconds (wall-clock time, no time zone).
+    Numbers are taken as epoch seconds already."""
+    if isinstance(when, (int, float)):
+        return int(when)
+    if isinstance(when, str):
+        when = datetime.datetime.fromisoformat(when)
+    elif not isinstance(when, datetime.datetime):  # a date
+        when = datetime.datetime(when.year, when.month, when.day)
+    return calendar.timegm(when.timetuple())
+
+def last_month(today=None):
+    """(first day of last month, first day of this month), e.g. for query(start=..., end=...)."""
+    today = today or datetime.date.today()
+    this_month = datetime.date(today.year, today.month, 1)
+    previous = (this_month - datetime.timedelta(days=1)).replace(day=1)
+    return previous, this_month
+
+# ---------------------------
+# Store
+# ---------------------------
+class ReportStore:
+    """Buffered writer + query API for reports.db. Use as a context manager or call close()."""
+
+    def __init__(self, path=REPORT_DB, batch_size=BATCH_SIZE, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.conn = sqlite3.connect(path, timeout=60)  # another tool may be importing report.txt
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits can be lost on power cut
+        self.conn.executescript(SCHEMA)
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        atexit.register(self.close)
+
+    def add(self, kind, inputs=None, outputs=None, value=None, unit=None, text=None, ts=None):
+        """Queue one calculation; it's written with the next batch."""
+        ts = to_epoch(datetime.datetime.now() if ts is None else ts)
+        self._buffer.append((ts, kind, value, unit,
+                             json.dumps(inputs) if inputs is not None else None,
+                             json.dumps(outputs) if outputs is not None else None, text))
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Insert everything queued in one transaction."""
+        if self._buffer:
+            rows, self._buffer = self._buffer, []
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO reports (ts, kind, value, unit, inputs, outputs, text) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows)
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def _where(self, kind, start, end, min_value, max_value):
+        clauses, params = [], []
+        for sql, arg in (("kind = ?", kind), ("ts >= ?", start), ("ts < ?", end),
+                         ("value >= ?", min_value), ("value <= ?", max_value)):
+            if arg is not None:
+                clauses.append(sql)
+                params.append(to_epoch(arg) if sql.startswith("ts") else arg)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, kind=None, start=None, end=None, min_value=None, max_value=None, limit=None, newest_first=False):
+        """Rows (dicts, inputs/outputs decoded) with start <= ts < end and value in
+        [min_value, max_value]. kind + time range are answered from the (kind, ts) index.
+        e.g. query("heating_load", *last_month(), min_value=50)"""
+        self.flush()
+        where, params = self._where(kind, start, end, min_value, max_value)
+        sql = (f"SELECT {', '.join(COLUMNS)}, strftime('%Y-%m-%d %H:%M:%S', ts, 'unixepoch') FROM reports{where} "
+               f"ORDER BY ts {'DESC' if newest_first else 'ASC'}, id")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        rows = []
+        for row in self.conn.execute(sql, params):
+            record = dict(zip(COLUMNS + ("time",), row))
+            for key in ("inputs", "outputs"):
+                record[key] = json.loads(record[key]) if record[key] else None
+            rows.append(record)
+        return rows
+
+    def summary(self, kind=None, start=None, end=None):
+        """{kind: (count, sum of value, max value)} over a time range."""
+        self.flush()
+        where, params = self._where(kind, start, end, None, None)
+        sql = f"SELECT kind, COUNT(*), SUM(value), MAX(value) FROM reports{where} GROUP BY kind"
+        return {k: (n, total, peak) for k, n, total, peak in self.conn.execute(sql, params)}
+
+    def explain(self, kind=None, start=None, end=None, min_value=None, max_value=None):
+        """SQLite's query plan for query(), to check that an index is used."""
+        where, params = self._where(kind, start, end, min_value, max_value)
+        plan = self.conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM reports{where} ORDER BY ts", params)
+        return [row[-1] for row in plan]
+
+    # ---------------------------
+    # One-time import of report.txt
+    # ---------------------------
+    def import_report_txt(self, path="report.txt"):
+        """One-time import of an old report.txt: every line becomes a row, all in one
+        transaction. A file that was already imported is skipped; a missing one is
+        recorded as imported with 0 rows (a new store for a tool that hasn't reported yet).
+        Safe when several tools open a new store at once: the check and the import run in one
+        write transaction, so the others wait for it and then find the file already imported.
+        Returns rows added."""
+        key = os.path.abspath(path)
+        self.flush()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")  # take the write lock before looking at imports
+            if self.conn.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+                return 0
+            with open(path, "r", encoding="utf-8", errors="replace") if os.path.exists(path) else io.StringIO() as f:
+                before = self.conn.total_changes
+                parsed = (parse_report_line(line.rstrip("\r\n")) for line in f)
+                self.conn.executemany(
+                    "INSERT INTO reports (ts, kind, value, unit, inputs, outputs, text) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((ts, kind, value, unit, json.dumps(inputs) if inputs else None,
+                      json.dumps(outputs) if outputs else None, text)
+                     for ts, kind, value, unit, inputs, outputs, text in filter(None, parsed)))
+                added = self.conn.total_changes - before
+            self.conn.execute("INSERT INTO imports (path, imported_at, rows) VALUES (?, ?, ?)",
+                              (key, to_epoch(datetime.datetime.now()), added))
+        return added
+
+# ---------------------------
+# report.txt line formats (as written by multi_tool_upgrade.py)
+# ---------------------------
+_NUMBER = r"(-?[\d,]+(?:\.\d+)?)"
+_LINE = re.compile(r"\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (.*)")
+_FORMATS = [
+    # Energy Cost — 12.00 kWh (43.20 MJ), €3.00
+    ("energy_cost", re.compile(rf"Energy Cost — {_NUMBER} kWh \({_NUMBER} MJ\), €{_NUMBER}"),
+     lambda kwh, mj, eur: ({"energy_kwh": kwh}, {"energy_mj": mj, "cost_eur": eur}, eur, "EUR")),
+    # Heating Load — Area 100.00 m², ΔT 20.00 °C, 600.00 kW   (the number is in W despite the label)
+    ("heating_load", re.compile(rf"Heating Load — Area {_NUMBER} m², ΔT {_NUMBER} °C, {_NUMBER} k?W"),
+     lambda area, dt, w: ({"area_m2": area, "temp_diff_c": dt}, {"load_w": w, "load_kw": w / 1000}, w / 1000, "kW")),
+    # CO₂ — 12.00 kWh (43.20 MJ), 2.80 kg
+    ("co2", re.compile(rf"CO₂ — {_NUMBER} kWh \({_NUMBER} MJ\), {_NUMBER} kg"),
+     lambda kwh, mj, kg: ({"energy_kwh": kwh}, {"energy_mj": mj, "co2_kg": kg}, kg, "kg"))]
+
+def parse_report_line(line):
+    """One report.txt line → (ts, kind, value, unit, inputs, outputs, text), or None for
+    lines without a timestamp. Unknown formats are kept as kind "note"."""
+    match = _LINE.match(line)
+    if not match:
+        return None
+    stamp, text = match.groups()
+    ts = to_epoch(stamp)
+    for kind, pattern, fields in _FORMATS:
+        m = pattern.match(text)
+        if m:
+            inputs, outputs, value, unit = fields(*(float(g.replace(",", "")) for g in m.groups()))
+            return ts, kind, value, unit, inputs, outputs, text
+    return ts, "note", None, None, None, None, text
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "query"):
+        print("Usage: python report_store.py import [report.txt]")
+        print("       python report_store.py query [kind] [from] [until] [min_value]")
+        sys.exit(1)
+    with ReportStore() as store:
+        if sys.argv[1] == "import":
+            path = sys.argv[2] if len(sys.argv) > 2 else "report.txt"
+            if not os.path.exists(path):
+                print(f"No such file: {path}")
+                sys.exit(1)
+            print(f"Imported {store.import_report_txt(path):,} entries from {path} into {REPORT_DB}")
+        else:
+            args = sys.argv[2:] + [None] * 4
+            kind, start, end = (a or None for a in args[:3])
+            min_value = float(args[3]) if args[3] else None
+            for r in store.query(kind, start, end, min_value):
+                print(f"[{r['time']}] {r['kind']:<13} {r['value'] if r['value'] is not None else '':>12} "
+                      f"{r['unit'] or '':<4} {json.dumps(r['inputs']) if r['inputs'] else r['text']}")
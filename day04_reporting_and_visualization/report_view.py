@@ -0,0 +1,160 @@
+# ---------------------------
+# Report viewing without loading all of report.txt
+# - tail(): last N entries, reading backwards from the end in blocks
+# - a sidecar index (report.txt.idx) with the byte offset and timestamp of
+#   every entry, so "entries K..K+n" or "entries between two dates" seek
+#   straight to the right bytes. The index only scans what was appended
+#   since it was last updated, under a lock, so several viewers can update it at once.
+# ---------------------------
+
+import os
+import numpy as np
+
+from energy_log_bin import to_epoch
+from writers import locked
+
+BLOCK_SIZE = 1 << 16        # tail() read size
+SCAN_BLOCK_SIZE = 1 << 24   # index update read size
+INDEX_SUFFIX = ".idx"
+HEADER = np.dtype([("indexed_end", "<i8"), ("version", "<i8")])
+ENTRY = np.dtype([("offset", "<i8"), ("ts", "<i8")])
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+# ---------------------------
+# Last N entries
+# ---------------------------
+def tail(path, n=20, block_size=BLOCK_SIZE):
+    """The last n lines of a text file, reading backwards one block at a time."""
+    if n <= 0:
+        return []
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        # n lines need n + 1 newlines to be sure the first one is complete
+        while pos > 0 and data.count(b"\n") <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return data.decode("utf-8", errors="replace").splitlines()[-n:]
+
+# ---------------------------
+# Sidecar offset index
+# ---------------------------
+def index_path(path):
+    return path + INDEX_SUFFIX
+
+def _read_header(f):
+    f.seek(0)
+    header = f.read(HEADER.itemsize)
+    if len(header) < HEADER.itemsize:
+        return 0
+    return int(np.frombuffer(header, dtype=HEADER)["indexed_end"][0])
+
+def _entry_timestamps(data, starts):
+    """Parse the "[YYYY-MM-DD HH:MM:SS]" prefix of each entry; NO_TIMESTAMP where there isn't one."""
+    ts = np.full(len(starts), NO_TIMESTAMP, dtype=np.int64)
+    if len(starts) == 0:
+        return ts
+    cols = np.minimum(starts[:, None] + np.arange(21), len(data) - 1)
+    prefix = np.ascontiguousarray(data[cols])
+    ok = (prefix[:, 0] == ord("[")) & (prefix[:, 20] == ord("]"))
+    stamps = prefix[ok, 1:20].copy().view("S19").ravel()
+    try:
+        ts[ok] = stamps.astype("datetime64[s]").astype(np.int64)
+    except ValueError:
+        for i, s in zip(np.flatnonzero(ok), stamps):
+            try:
+                ts[i] = to_epoch(s.decode())
+            except ValueError:
+                pass
+    return ts
+
+def update_index(path):
+    """Bring path's sidecar index up to date and return the number of entries."""
+    return _update_index(path)[0]
+
+def _update_index(path):
+    """update_index() → (entries, indexed_end), both read while the index is locked.
+    Several viewers may update the same index at once, so the whole update runs
+    under an exclusive lock on the .idx file (the same fcntl lock the writers use)."""
+    idx = index_path(path)
+    size = os.path.getsize(path)
+    with os.fdopen(os.open(idx, os.O_RDWR | os.O_CREAT), "r+b") as f, locked(f):
+        indexed_end = _read_header(f)
+        if indexed_end > size:  # report was truncated or replaced: start over
+            indexed_end = 0
+        if indexed_end == 0:
+            f.seek(0)
+            f.truncate()
+            f.write(np.zeros(1, dtype=HEADER).tobytes())
+
+        if indexed_end < size:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+            last_ts = NO_TIMESTAMP
+            if f.seek(0, os.SEEK_END) > HEADER.itemsize:
+                f.seek(-ENTRY.itemsize, os.SEEK_END)
+                last_ts = int(np.frombuffer(f.read(ENTRY.itemsize), dtype=ENTRY)["ts"][0])
+            pos = indexed_end
+            while pos < size:
+                block_end = min(pos + SCAN_BLOCK_SIZE, size)
+                newlines = np.flatnonzero(data[pos:block_end] == ord("\n")) + pos
+                if len(newlines) == 0:
+                    if block_end == size:
+                        break  # last line isn't finished yet
+                    pos = block_end
+                    continue
+                starts = np.concatenate(([indexed_end], newlines[:-1] + 1))
+                entries = np.empty(len(starts), dtype=ENTRY)
+                entries["offset"] = starts
+                # entries without a timestamp (or out of order) take the previous one,
+                # so the ts column stays sorted for binary search
+                ts = np.maximum.accumulate(np.concatenate(([last_ts], _entry_timestamps(data, starts))))[1:]
+                entries["ts"] = ts
+                last_ts = int(ts[-1])
+                f.write(entries.tobytes())
+                indexed_end = pos = int(newlines[-1]) + 1
+            f.seek(0)
+            f.write(np.array([(indexed_end, 1)], dtype=HEADER).tobytes())
+            f.flush()  # everything is in the file before the lock is released
+            del data
+        return (f.seek(0, os.SEEK_END) - HEADER.itemsize) // ENTRY.itemsize, indexed_end
+
+def load_index(path):
+    """(entries, indexed_end): entries is a memmap with "offset" and "ts" columns."""
+    count, indexed_end = _update_index(path)
+    if count == 0:
+        return np.empty(0, dtype=ENTRY), indexed_end
+    entries = np.memmap(index_path(path), dtype=ENTRY, mode="r", offset=HEADER.itemsize, shape=(count,))
+    return entries, indexed_end
+
+# ---------------------------
+# Reading entries through the index
+# ---------------------------
+def _read_span(path, entries, indexed_end, lo, hi):
+    """Decode entries lo..hi-1 with a single seek + read."""
+    if lo >= hi:
+        return []
+    start = int(entries["offset"][lo])
+    stop = int(entries["offset"][hi]) if hi < len(entries) else indexed_end
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(stop - start).decode("utf-8", errors="replace").splitlines()
+
+def count_entries(path):
+    return update_index(path)
+
+def read_entries(path, start, count):
+    """Entries start .. start+count-1 (0-based), e.g. one page of the report."""
+    entries, indexed_end = load_index(path)
+    lo = min(max(start, 0), len(entries))
+    return _read_span(path, entries, indexed_end, lo, min(lo + count, len(entries)))
+
+def entries_between(path, start=None, end=None):
+    """Entries with start <= timestamp < end (datetimes or "YYYY-MM-DD[ HH:MM:SS]" strings).
+    Binary-searches the index, which assumes entries were appended in time order."""
+    entries, indexed_end = load_index(path)
+    ts = entries["ts"]
+    lo = 0 if start is None else int(np.searchsorted(ts, to_epoch(start), side="left"))
+    hi = len(entries) if end is None else int(np.searchsorted(ts, to_epoch(end), side="left"))
+    return _read_span(path, entries, indexed_end, lo, hi)
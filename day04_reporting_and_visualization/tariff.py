@@ -0,0 +1,203 @@
+# ---------------------------
+# Time-of-use tariff engine
+# A tariff (JSON file or dict) describes:
+#   - time-of-use bands: a rate per kWh for some days of the week and hours
+#     (night, peak, weekend, ...); hours no band covers use "default_rate"
+#   - a standing charge per day
+#   - tiered blocks: an extra charge (or discount) per kWh once the month's
+#     consumption passes a threshold
+# compile_tariff() turns that into lookup arrays - hour-of-week (0-167,
+# Monday 00:00 first) → rate and → band - so pricing interval readings is a
+# few vectorized NumPy operations. Compiled tariffs are cached.
+#
+# Example tariff:
+# {"name": "Day/Night", "default_rate": 0.32, "standing_charge_per_day": 0.65,
+#  "bands": [{"name": "night", "rate": 0.18, "days": "mon-sun", "hours": [23, 8]},
+#            {"name": "peak", "rate": 0.41, "days": "mon-fri", "hours": [17, 19]}],
+#  "tiers": [{"from_kwh": 0, "adder": 0.0}, {"from_kwh": 1000, "adder": 0.03}]}
+# Bands are applied in order, so a later band wins where two overlap.
+# "hours": [start, end) in local hours; start > end wraps past midnight into
+# the next day, so [23, 8] on "mon-fri" runs from Friday 23:00 to Saturday 08:00.
+# ---------------------------
+
+import os, sys, json, functools
+import numpy as np
+
+TARIFF_FILE = "tariff.json"
+HOURS_PER_WEEK = 168
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_EPOCH_HOUR_OFFSET = 72  # 1970-01-01 was a Thursday: 3 days after a Monday
+
+# ---------------------------
+# Compiling
+# ---------------------------
+def _parse_days(spec):
+    """"mon-fri", "sat,sun", ["mon", "wed"] → set of day numbers (Monday = 0)."""
+    parts = spec.split(",") if isinstance(spec, str) else spec
+    days = set()
+    for part in parts:
+        first, _, last = part.strip().lower().partition("-")
+        a = DAYS.index(first[:3])
+        b = DAYS.index(last[:3]) if last else a
+        days.update(DAYS.index(d) for d in (DAYS[a:b + 1] if a <= b else DAYS[a:] + DAYS[:b + 1]))
+    return days
+
+def _week_hours(days, spec):
+    """Hours of the week (0-167) a band covers. A band that wraps past midnight
+    ([23, 8] on "fri") runs into the next morning (Saturday 00:00-08:00)."""
+    start, end = (int(h) for h in spec)
+    if start < end:
+        return [day * 24 + h for day in days for h in range(start, end)]
+    return [(day * 24 + h) % HOURS_PER_WEEK for day in days for h in range(start, 24 + end)]
+
+class CompiledTariff:
+    """A tariff as lookup arrays. rates[h] / band_of_hour[h] for h = hour of week."""
+
+    def __init__(self, definition):
+        self.name = definition.get("name", "tariff")
+        self.standing_charge_per_day = float(definition.get("standing_charge_per_day", 0.0))
+        self.band_names = ["standard"]
+        self.band_of_hour = np.zeros(HOURS_PER_WEEK, dtype=np.int8)
+        band_rates = [float(definition.get("default_rate", 0.0))]
+        for band in definition.get("bands", []):
+            self.band_names.append(band["name"])
+            band_rates.append(float(band["rate"]))
+            hours = _week_hours(_parse_days(band.get("days", "mon-sun")), band.get("hours", [0, 24]))
+            self.band_of_hour[hours] = len(self.band_names) - 1
+        self.band_rates = np.array(band_rates)
+        self.rates = self.band_rates[self.band_of_hour]
+        tiers = sorted(definition.get("tiers", []), key=lambda t: t["from_kwh"])
+        self.tier_starts = np.array([float(t["from_kwh"]) for t in tiers])
+        self.tier_adders = np.array([float(t["adder"]) for t in tiers])
+
+    # ---------------------------
+    # Pricing
+    # ---------------------------
+    @staticmethod
+    def hour_of_week(timestamps):
+        """Epoch seconds (naive local time, like energy_log.bin) → 0..167, Monday 00:00 = 0."""
+        return (np.asarray(timestamps, dtype=np.int64) // 3600 + _EPOCH_HOUR_OFFSET) % HOURS_PER_WEEK
+
+    def rate_at(self, timestamps):
+        """Time-of-use rate (€/kWh) for each timestamp."""
+        return self.rates[self.hour_of_week(timestamps)]
+
+    def tier_charges(self, month_kwh_before, kwh):
+        """Tier adders for readings, given how much was used earlier in the same month."""
+        if len(self.tier_starts) == 0:
+            return np.zeros(len(kwh))
+        before = np.asarray(month_kwh_before, dtype=np.float64)
+        after = before + kwh
+        bounds = np.append(self.tier_starts, np.inf)
+        # kWh of each reading that falls inside tier i: overlap of [before, after) with [start_i, start_i+1)
+        lo, hi = bounds[:-1, None], bounds[1:, None]
+        in_tier = np.clip(np.minimum(after, hi) - np.maximum(before, lo), 0.0, None)
+        return self.tier_adders @ in_tier
+
+    def month_tier_charges(self, timestamps, kwh, month_kwh_before=None):
+        """Tier adders for time-ordered readings: a running total per calendar month
+        decides which block each kWh falls in. month_kwh_before carries the month's
+        consumption from an earlier chunk ({month number: kWh})."""
+        if len(self.tier_starts) == 0 or len(kwh) == 0:
+            return np.zeros(len(kwh))
+        months = np.asarray(timestamps, dtype="datetime64[s]").astype("datetime64[M]").astype(np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+        lengths = np.diff(np.append(starts, len(kwh)))
+        running = np.cumsum(kwh) - kwh                    # kWh before each reading (whole chunk)
+        carried = np.array([(month_kwh_before or {}).get(int(m), 0.0) for m in months[starts]])
+        before = running - np.repeat(running[starts] - carried, lengths)  # … since the start of its month
+        return self.tier_charges(before, kwh)
+
+    def price(self, timestamps, kwh, month_kwh_before=None):
+        """Cost (€) of each interval reading: time-of-use rate × kWh plus tier adders."""
+        ts = np.asarray(timestamps, dtype=np.int64)
+        kwh = np.asarray(kwh, dtype=np.float64)
+        return self.rates[self.hour_of_week(ts)] * kwh + self.month_tier_charges(ts, kwh, month_kwh_before)
+
+    def standing_charge(self, days):
+        return self.standing_charge_per_day * days
+
+    def bill(self, chunks):
+        """Stream (timestamps, kWh) chunks (in time order) into a bill:
+        kWh / € per band, tier charges, standing charge (per calendar day with data) and total."""
+        kwh_by_band = np.zeros(len(self.band_names))
+        cost_by_band = np.zeros(len(self.band_names))
+        month_kwh, tiers, days, last_day = {}, 0.0, 0, None
+        for ts, kwh in chunks:
+            ts = np.asarray(ts, dtype=np.int64)
+            kwh = np.asarray(kwh, dtype=np.float64)
+            if len(kwh) == 0:
+                continue
+            band = self.band_of_hour[self.hour_of_week(ts)]
+            kwh_by_band += np.bincount(band, weights=kwh, minlength=len(self.band_names))
+            cost_by_band += np.bincount(band, weights=kwh * self.band_rates[band], minlength=len(self.band_names))
+            tiers += float(self.month_tier_charges(ts, kwh, month_kwh).sum())
+            months = ts.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+            for m, total in zip(*_sum_by_key(months, kwh)):
+                month_kwh[m] = month_kwh.get(m, 0.0) + total
+            day_numbers = np.unique(ts // 86_400)
+            days += len(day_numbers) - int(day_numbers[0] == last_day)
+            last_day = int(day_numbers[-1])
+        standing = self.standing_charge(days)
+        return {
+            "kwh_by_band": dict(zip(self.band_names, kwh_by_band.tolist())),
+            "cost_by_band": dict(zip(self.band_names, cost_by_band.tolist())),
+            "kwh": float(kwh_by_band.sum()),
+            "energy_cost": float(cost_by_band.sum()),
+            "tier_charges": tiers,
+            "days": days,
+            "standing_charge": standing,
+            "total": float(cost_by_band.sum()) + tiers + standing,
+        }
+
+    def price_monthly(self, monthly_kwh, profile=None, days=30):
+        """Monthly cost for many buildings from monthly kWh totals only (no interval data):
+        the kWh is spread over the week with `profile` (168 weights, flat if None),
+        tiers apply to the month's total, plus the standing charge for `days` days.
+        Day 5's tariff_costs.monthly_costs is a copy of this; bench_tariff.py checks they agree."""
+        monthly_kwh = np.asarray(monthly_kwh, dtype=np.float64)
+        weights = np.ones(HOURS_PER_WEEK) if profile is None else np.asarray(profile, dtype=np.float64)
+        average_rate = float(weights @ self.rates / weights.sum())
+        cost = monthly_kwh * average_rate + self.standing_charge(days)
+        if len(self.tier_starts):
+            cost += self.tier_charges(np.zeros_like(monthly_kwh), monthly_kwh)
+        return cost
+
+def _sum_by_key(keys, values):
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts].tolist(), np.add.reduceat(values, starts).tolist()
+
+# ---------------------------
+# Loading + cache
+# ---------------------------
+@functools.lru_cache(maxsize=32)
+def _compile_cached(key):
+    return CompiledTariff(json.loads(key))
+
+def compile_tariff(definition):
+    """dict → CompiledTariff. The same definition is only compiled once."""
+    return _compile_cached(json.dumps(definition, sort_keys=True))
+
+@functools.lru_cache(maxsize=32)
+def _load_cached(path, mtime):
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_tariff(json.load(f))
+
+def load_tariff(path=TARIFF_FILE):
+    """Compiled tariff from a JSON file (recompiled only when the file changes)."""
+    return _load_cached(os.path.abspath(path), os.path.getmtime(path))
+
+if __name__ == "__main__":
+    from energy_log_bin import ENERGY_LOG_BIN, iter_chunks
+    if len(sys.argv) < 2:
+        print("Usage: python tariff.py tariff.json [energy_log.bin|energy_log.csv]")
+        sys.exit(1)
+    tariff = load_tariff(sys.argv[1])
+    bill = tariff.bill(iter_chunks(sys.argv[2] if len(sys.argv) > 2 else ENERGY_LOG_BIN))
+    print(f"Tariff: {tariff.name}")
+    for band, kwh in bill["kwh_by_band"].items():
+        if kwh:
+            print(f"  {band:<10} {kwh:12,.2f} kWh  €{bill['cost_by_band'][band]:12,.2f}")
+    print(f"  Tier charges:    €{bill['tier_charges']:,.2f}")
+    print(f"  Standing charge: €{bill['standing_charge']:,.2f} ({bill['days']} days)")
+    print(f"Total: {bill['kwh']:,.2f} kWh = €{bill['total']:,.2f}")
@@ -0,0 +1,194 @@
+# ---------------------------
+# Buffered writers for report.txt and energy_log.csv
+# Keep the file open, collect lines in memory and write them in one go
+# when the buffer is full, when flush_interval seconds have passed since
+# the last flush, or when the writer is closed (context manager / atexit).
+# A timer flushes a lone record flush_interval seconds after it arrives, so in
+# the interactive menu the last line reaches the file even if nothing follows.
+# The lines written are exactly the same as the old one-line-per-call code.
+# energy_log.bin is only a mirror of the CSV: if updating it fails, the CSV
+# batch is still written and the binary log is rebuilt from the CSV next time.
+# Several processes can write the same files at once: each batch is written
+# while holding an exclusive fcntl lock on that file (one lock per file, taken
+# once per batch, not per line), so lines never interleave and only one writer
+# ever adds the CSV header.
+# The files also stay in time order: a batch from another process may already
+# hold newer lines, so under the lock any record older than the file's last
+# line takes that line's timestamp (so readers can binary-search by time).
+# ---------------------------
+
+import os, re, csv, time, atexit, calendar, datetime, contextlib, threading
+try:
+    import fcntl  # POSIX only; without it (Windows) batches are appended unlocked
+except ImportError:
+    fcntl = None
+
+# energy_log_bin (and with it numpy) is only imported when the binary log is written,
+# so importing this module stays cheap
+ENERGY_LOG_BIN = "energy_log.bin"  # same default as energy_log_bin.ENERGY_LOG_BIN
+STAMP = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d")
+
+
+@contextlib.contextmanager
+def locked(f):
+    """Hold an exclusive lock on an open file while one batch is written.
+    The lock is advisory: it keeps out other writers that lock too."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def last_line(f, size=512):
+    """The last line of an open file (opened "a+"), read from its end; "" if empty."""
+    end = os.fstat(f.fileno()).st_size
+    tail = os.pread(f.fileno(), min(size, end), max(0, end - size)) if end else b""
+    return tail.rstrip(b"\r\n").rsplit(b"\n", 1)[-1].decode("utf-8", errors="replace")
+
+
+def clamp_stamps(records, newest):
+    """Records are (stamp, epoch, ...) tuples in order. Any stamp older than `newest`
+    (the "YYYY-MM-DD HH:MM:SS" already at the end of the file, or None) becomes `newest`."""
+    if newest is None or records[0][0] >= newest:  # fixed-width stamps sort as strings
+        return records
+    epoch = calendar.timegm(time.strptime(newest, "%Y-%m-%d %H:%M:%S"))
+    return [(newest, epoch) + r[2:] if r[0] < newest else r for r in records]
+
+
+class _BufferedWriter:
+    """Shared buffering / flushing logic. Subclasses provide _open() and _write()."""
+
+    def __init__(self, path, max_records=1000, flush_interval=1.0):
+        self.path = path
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        self._file = None
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._stamp_second = None
+        self._lock = threading.RLock()  # the flush timer runs on its own thread
+        self._timer = None
+        atexit.register(self.close)
+
+    def _newest_stamp(self):
+        """Timestamp of the file's last line, or None. Only needed when other processes
+        can write between our batches, i.e. when batches are locked."""
+        if fcntl is None:
+            return None
+        match = STAMP.match(last_line(self._file).lstrip("["))
+        return match.group() if match else None
+
+    def _timestamp(self):
+        """("YYYY-MM-DD HH:MM:SS", epoch seconds) for now. strftime only runs once per second."""
+        second = int(time.time())
+        if second != self._stamp_second:
+            now = datetime.datetime.fromtimestamp(second)
+            self._stamp = (now.strftime("%Y-%m-%d %H:%M:%S"), calendar.timegm(now.timetuple()))  # = to_epoch(now)
+            self._stamp_second = second
+        return self._stamp
+
+    def _add(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            if (len(self._buffer) >= self.max_records
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+            elif self._timer is None:
+                # at most one timer per flush_interval: flushes this record even if no other one comes
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far and push it to the OS."""
+        with self._lock:
+            if self._buffer:
+                if self._file is None:
+                    self._file = self._open()
+                records, self._buffer = self._buffer, []
+                with locked(self._file):
+                    self._write(records)
+                    self._file.flush()  # the whole batch is in the file before the lock is released
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReportWriter(_BufferedWriter):
+    """Buffered replacement for save_report: "[timestamp] text" lines in report.txt."""
+
+    def __init__(self, path="report.txt", **kwargs):
+        super().__init__(path, **kwargs)
+
+    def _open(self):
+        return open(self.path, "a+", encoding="utf-8")
+
+    def write(self, text):
+        ts, epoch = self._timestamp()
+        self._add((ts, epoch, text))
+
+    def _write(self, records):
+        records = clamp_stamps(records, self._newest_stamp())
+        self._file.write("".join(f"[{ts}] {text}\n" for ts, _, text in records))
+
+
+class EnergyLogWriter(_BufferedWriter):
+    """Buffered replacement for log_energy_usage: "timestamp,kwh" rows in
+    energy_log.csv (header on a new file), mirrored into the binary log."""
+
+    def __init__(self, path="energy_log.csv", bin_path=ENERGY_LOG_BIN, **kwargs):
+        super().__init__(path, **kwargs)
+        self.bin_path = bin_path
+
+    def _open(self):
+        return open(self.path, "a+", newline="", encoding="utf-8")
+
+    def log(self, kwh):
+        ts, epoch = self._timestamp()
+        self._add((ts, epoch, kwh))
+
+    def _write(self, records):
+        records = clamp_stamps(records, self._newest_stamp())
+        writer = csv.writer(self._file)
+        if os.fstat(self._file.fileno()).st_size == 0:  # checked under the lock, so one header only
+            writer.writerow(["timestamp", "kwh"])
+        writer.writerows((ts, kwh) for ts, _, kwh in records)
+        if self.bin_path is None:
+            return
+        from energy_log_bin import append_readings, csv_to_bin
+        # still under the CSV's lock: the binary log gets the batches in the same order
+        try:
+            if not os.path.exists(self.bin_path):
+                self._file.flush()
+                csv_to_bin(self.path, self.bin_path)  # first write since the binary log was added
+            else:
+                append_readings([epoch for _, epoch, _ in records], [kwh for _, _, kwh in records], self.bin_path)
+        except Exception as e:
+            # the CSV already has the batch; drop the binary log so the next batch rebuilds it from the CSV
+            print(f"Binary log not updated: {e}")
+            if os.path.exists(self.bin_path):
+                os.remove(self.bin_path)
@@ -3,7 +3,12 @@
 # Learning to work with multiple buildings at once
 # ---------------------------
 
-# My building portfolio with some example buildings plus the hospital I added
+import os
+from portfolio import Portfolio
+from heating_sim import load_weather_csv, simulate_portfolio, synthetic_weather
+from tariff_costs import load_tariff, monthly_costs
+
+# My building portfolio with some example buildings (the hospital gets added in Task 1)
 buildings_portfolio = [
     {
         "name": "Office Tower A",
@@ -36,24 +41,29 @@ buildings_portfolio = [
         "city": "Galway",
         "heating_system": "gas_boiler", 
         "monthly_energy_kwh": 2800
-    },
-    {
-        "name": "St. Vincent's Hospital",
-        "area": 50000,
-        "u_value": 0.5,
-        "city": "Dublin",
-        "heating_system": "gas_boiler",
-        "monthly_energy_kwh": 50000
     }
 ]
 
+# Load the list into a column-based Portfolio (see portfolio.py) so every
+# task below is one vectorized pass instead of a loop over dicts
+portfolio = Portfolio.from_records(buildings_portfolio)
+portfolio.build_indexes()  # city / heating system / U-value lookups without scanning every building
+
 print("=== My Building Portfolio Analysis ===\n")
 
 # ---------------------------
 # Task 1: Added St. Vincent's Hospital to my portfolio
 # ---------------------------
 print("Task 1: Added St. Vincent's Hospital")
-print(f"Now managing {len(buildings_portfolio)} buildings total\n")
+portfolio.add({  # the indexes update as the hospital goes in
+    "name": "St. Vincent's Hospital",
+    "area": 50000,
+    "u_value": 0.5,
+    "city": "Dublin",
+    "heating_system": "gas_boiler",
+    "monthly_energy_kwh": 50000
+})
+print(f"Now managing {len(portfolio)} buildings total\n")
 
 # ---------------------------
 # Task 2: Find all my Dublin buildings
@@ -61,16 +71,12 @@ print(f"Now managing {len(buildings_portfolio)} buildings total\n")
 print("Task 2: Finding all buildings in Dublin")
 print("-" * 40)
 
-dublin_buildings = []  # Empty list to collect my Dublin buildings
-
-# Check each building to see if it's in Dublin
-for building in buildings_portfolio:
-    if building["city"] == "Dublin":  # If building is in Dublin
-        dublin_buildings.append(building)  # Add it to my Dublin list
+dublin_rows = portfolio.rows_with("city", "Dublin")  # straight from the city index
+dublin_names = portfolio.names[dublin_rows]
 
-print(f"I have {len(dublin_buildings)} buildings in Dublin:")
-for building in dublin_buildings:
-    print(f"  - {building['name']}")
+print(f"I have {len(dublin_names)} buildings in Dublin:")
+for name in dublin_names:
+    print(f"  - {name}")
 
 print()
 
@@ -80,22 +86,9 @@ print()
 print("Task 3: Calculate average U-value for my buildings")
 print("-" * 40)
 
-# Going to add up all U-values and divide by number of buildings
-total_u_value = 0
-building_count = 0
-
-for building in buildings_portfolio:
-    total_u_value += building["u_value"]
-    building_count += 1
-
-average_u_value = total_u_value / building_count
+average_u_value = portfolio.aggregate("u_value", "mean")
 print(f"Average U-value across my portfolio: {average_u_value:.3f} W/m²·K")
 
-# Let me try a different way using Python shortcuts
-u_values = [building["u_value"] for building in buildings_portfolio]
-average_u_value_v2 = sum(u_values) / len(u_values)
-print(f"Double-checking with method 2: {average_u_value_v2:.3f} W/m²·K")
-
 print()
 
 # ---------------------------
@@ -104,15 +97,7 @@ print()
 print("Task 4: Which city has most of my buildings?")
 print("-" * 40)
 
-# I need to count how many buildings I have in each city
-city_counts = {}  # This will store city names and counts
-
-for building in buildings_portfolio:
-    city = building["city"]
-    if city in city_counts:
-        city_counts[city] += 1  # Add one more to this city's count
-    else:
-        city_counts[city] = 1   # First building I have in this city
+city_counts = portfolio.group_by("city")  # {city: number of buildings}
 
 print("My buildings by city:")
 for city, count in city_counts.items():
@@ -132,21 +117,24 @@ print()
 print("Task 5: What are my total monthly energy costs?")
 print("-" * 40)
 
-cost_per_kwh = 0.25  # Assuming €0.25 per kWh
-total_energy = 0
-total_cost = 0
+energy = portfolio.column("monthly_energy_kwh")
+if os.path.exists("tariff.json"):
+    # time-of-use tariff (bands, standing charge, tiers), same format as the Day 4 tariff engine
+    tariff = load_tariff("tariff.json")
+    costs = monthly_costs(tariff, energy)  # every building's cost in one go
+    print(f"Tariff: {tariff.get('name', 'tariff')} (flat usage over the week, standing charge for 30 days)")
+else:
+    cost_per_kwh = 0.25  # Assuming €0.25 per kWh
+    costs = energy * cost_per_kwh  # every building's cost in one go
+total_energy = energy.sum()
+total_cost = costs.sum()
 
 print("Cost breakdown for each building:")
-for building in buildings_portfolio:
-    energy = building["monthly_energy_kwh"]
-    cost = energy * cost_per_kwh
-    total_energy += energy
-    total_cost += cost
-    
-    print(f"  {building['name']}: {energy:,} kWh = €{cost:,.2f}")
+for name, kwh, cost in zip(portfolio.names, energy, costs):
+    print(f"  {name}: {kwh:,.0f} kWh = €{cost:,.2f}")
 
 print(f"\nMy portfolio monthly totals:")
-print(f"  Total energy consumption: {total_energy:,} kWh")
+print(f"  Total energy consumption: {total_energy:,.0f} kWh")
 print(f"  Total monthly cost: €{total_cost:,.2f}")
 
 print()
@@ -157,14 +145,11 @@ print()
 print("Extra: Which of my buildings use gas boilers?")
 print("-" * 40)
 
-gas_boiler_buildings = []
-for building in buildings_portfolio:
-    if building["heating_system"] == "gas_boiler":
-        gas_boiler_buildings.append(building)
+gas_boiler_buildings = portfolio.select(portfolio.rows_with("heating_system", "gas_boiler"))
 
 print(f"I have {len(gas_boiler_buildings)} buildings with gas boilers:")
-for building in gas_boiler_buildings:
-    print(f"  - {building['name']} in {building['city']}")
+for name, city in zip(gas_boiler_buildings.names, gas_boiler_buildings.column("city")):
+    print(f"  - {name} in {city}")
 
 print()
 
@@ -174,13 +159,31 @@ print()
 print("Extra: Buildings that might need insulation upgrades (U-value > 0.4)")
 print("-" * 40)
 
-poor_insulation_count = 0
-for building in buildings_portfolio:
-    if building["u_value"] > 0.4:
-        poor_insulation_count += 1
-        print(f"  - {building['name']}: {building['u_value']} W/m²·K")
+poor_insulation = portfolio.rows_greater_than("u_value", 0.4)  # range read from the sorted U-value index
+for name, u_value in zip(portfolio.names[poor_insulation], portfolio.column("u_value")[poor_insulation]):
+    print(f"  - {name}: {u_value} W/m²·K")
+
+print(f"\nBuildings I should consider upgrading: {len(poor_insulation)}")
+
+print()
+
+# ---------------------------
+# More practice: A year of hourly heating demand (8760 hours)
+# ---------------------------
+print("Extra: Annual heating demand from hourly weather (setpoint 20 °C)")
+print("-" * 40)
 
-print(f"\nBuildings I should consider upgrading: {poor_insulation_count}")
+# weather.csv (hour,Dublin,Cork,Galway) if I have one, otherwise a made-up typical year
+if os.path.exists("weather.csv"):
+    weather = load_weather_csv("weather.csv")
+else:
+    weather = synthetic_weather({"Dublin": 10.0, "Cork": 10.5, "Galway": 10.2})
+heating = simulate_portfolio(portfolio, weather)  # (buildings × hours) load, worked out in chunks
+
+for name, peak_kw, annual_kwh in zip(portfolio.names, heating["peak_kw"], heating["annual_kwh"]):
+    print(f"  {name}: peak {peak_kw:,.1f} kW, {annual_kwh:,.0f} kWh/year")
+print(f"\nPortfolio peak (all buildings at once): {heating['portfolio_peak_kw']:,.1f} kW "
+      f"at hour {heating['peak_hour']} of the year")
 
 print("\n" + "="*60)
 print("Day 4 of learning completed I will now spend time going back through the code I wrote and breaking it down to fully understand what is happening with each line of code ")
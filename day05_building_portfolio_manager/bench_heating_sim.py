@@ -0,0 +1,55 @@
+# ---------------------------
+# Benchmark + check: 8760-hour heating simulation for a big portfolio
+# - random buildings spread over a few cities, synthetic weather
+# - checks the chunked result against the closed form
+#   (one setpoint: peak = UA × max ΔT, annual = UA × sum ΔT for the building's city)
+# - reports the run time and peak traced memory (bounded by the chunk size)
+# Run: python bench_heating_sim.py [buildings] [chunk_mb]
+# ---------------------------
+
+import sys, time, tracemalloc
+import numpy as np
+
+from heating_sim import HOURS_PER_YEAR, SETPOINT_C, simulate, synthetic_weather
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    chunk_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    rng = np.random.default_rng(0)
+    weather = synthetic_weather({"Dublin": 10.0, "Cork": 10.5, "Galway": 10.2, "Belfast": 9.5})
+    temps = np.stack(list(weather.values()))
+    area = rng.uniform(100, 50_000, n)
+    u_value = rng.uniform(0.15, 0.6, n)
+    codes = rng.integers(0, len(temps), n)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = simulate(area, u_value, codes, temps, chunk_bytes=int(chunk_mb * 1024 ** 2))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    delta_t = np.maximum(SETPOINT_C - temps, 0.0)
+    ua_kw = area * u_value / 1000.0
+    assert np.allclose(result["peak_kw"], ua_kw * delta_t.max(axis=1)[codes])
+    assert np.allclose(result["annual_kwh"], ua_kw * delta_t.sum(axis=1)[codes])
+
+    # per-building setpoints: compare a small sample with a plain loop
+    sample = 200
+    setpoints = rng.uniform(16, 22, sample)
+    small = simulate(area[:sample], u_value[:sample], codes[:sample], temps, setpoints)
+    for i in range(sample):
+        load = ua_kw[i] * np.maximum(setpoints[i] - temps[codes[i]], 0.0)
+        assert np.isclose(small["peak_kw"][i], load.max()) and np.isclose(small["annual_kwh"][i], load.sum())
+
+    cells = n * HOURS_PER_YEAR
+    full_gb = cells * 8 / 1e9
+    print(f"{n:,} buildings x {HOURS_PER_YEAR} h = {cells / 1e9:.2f} billion load values")
+    print(f"Time: {elapsed:.2f} s ({cells / elapsed / 1e6:,.0f} M values/s)")
+    print(f"Peak traced memory: {peak / 1e6:,.0f} MB (the full matrix would be {full_gb:,.1f} GB)")
+    print(f"Portfolio peak: {result['portfolio_peak_kw']:,.0f} kW at hour {result['peak_hour']}, "
+          f"annual demand {result['annual_kwh'].sum() / 1e6:,.1f} GWh")
+    print("Checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# ---------------------------
+# Hourly heating-load simulation for a whole portfolio
+# Same formula as heating_load() in the Day 4 multi-tool (area × U-value × ΔT),
+# but for every hour of a year (8760 h) against each building's city weather:
+#   load[building, hour] = area × u_value × max(setpoint - outdoor_temp[city, hour], 0)
+# The (buildings × hours) matrix is built with NumPy broadcasting a chunk of
+# buildings at a time, so memory stays bounded even for 500k buildings.
+# Results per building: peak kW and annual kWh; for the portfolio: the hourly
+# total profile and its (coincident) peak.
+# ---------------------------
+
+import csv, sys
+import numpy as np
+
+from portfolio import Portfolio
+
+HOURS_PER_YEAR = 8760
+SETPOINT_C = 20.0                 # indoor temperature the heating keeps up
+CHUNK_BYTES = 8 * 1024 ** 2       # one chunk of the load matrix; small enough to stay in CPU cache
+
+
+# ---------------------------
+# Weather
+# ---------------------------
+def load_weather_csv(path):
+    """Hourly outdoor temperatures (°C) per city from a CSV with one column per city
+    (header e.g. "hour,Dublin,Cork,Galway"; an "hour" column is ignored).
+    Returns {city: float64 array}."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    return {city: np.ascontiguousarray(data[:, i]) for i, city in enumerate(header) if city != "hour"}
+
+
+def synthetic_weather(mean_temps, hours=HOURS_PER_YEAR, seed=0):
+    """Made-up but plausible hourly temperatures for testing: a yearly cycle (coldest in
+    mid-January), a daily cycle (coldest before dawn) and some noise.
+    mean_temps: {city: annual mean °C}."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(hours)
+    yearly = -5.0 * np.cos(2 * np.pi * (t - 15 * 24) / HOURS_PER_YEAR)
+    daily = -3.0 * np.cos(2 * np.pi * (t - 5) / 24)
+    return {city: mean + yearly + daily + rng.normal(0, 1.5, hours) for city, mean in mean_temps.items()}
+
+
+# ---------------------------
+# Simulation
+# ---------------------------
+def simulate(area, u_value, city_codes, temps, setpoint=SETPOINT_C, chunk_bytes=CHUNK_BYTES):
+    """Hourly load for every building, one chunk of buildings at a time.
+    area, u_value: per-building arrays; city_codes: row of `temps` for each building;
+    temps: (cities, hours) outdoor °C; setpoint: one value or one per building.
+    Returns {"peak_kw", "annual_kwh"} per building plus the portfolio "hourly_kw"
+    profile, its "portfolio_peak_kw" and "peak_hour"."""
+    ua = np.asarray(area, dtype=np.float64) * np.asarray(u_value, dtype=np.float64)  # W per K
+    codes = np.asarray(city_codes, dtype=np.intp)
+    temps = np.atleast_2d(np.asarray(temps, dtype=np.float64))
+    n, hours = len(ua), temps.shape[1]
+    if n and (codes.min() < 0 or codes.max() >= len(temps)):
+        raise IndexError("city code without a temperature series")
+    per_building_setpoint = np.ndim(setpoint) > 0
+    if per_building_setpoint:
+        setpoint = np.asarray(setpoint, dtype=np.float64)
+    else:
+        delta_t = np.maximum(setpoint - temps, 0.0)  # ΔT per city and hour, shared by its buildings
+
+    chunk = max(1, min(n, chunk_bytes // (hours * 8)))
+    buf = np.empty((chunk, hours))
+    peak_kw, annual_kwh = np.empty(n), np.empty(n)
+    hourly_kw = np.zeros(hours)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        load = buf[:stop - start]
+        if per_building_setpoint:
+            np.take(temps, codes[start:stop], axis=0, out=load, mode="clip")  # codes checked above; "clip" writes straight into out
+            np.subtract(setpoint[start:stop, None], load, out=load)
+            np.maximum(load, 0.0, out=load)
+        else:
+            np.take(delta_t, codes[start:stop], axis=0, out=load, mode="clip")
+        load *= ua[start:stop, None] / 1000.0              # kW for each building and hour
+        peak_kw[start:stop] = load.max(axis=1)
+        annual_kwh[start:stop] = load.sum(axis=1)          # 1-hour steps, so kW summed = kWh
+        hourly_kw += load.sum(axis=0)
+    peak_hour = int(np.argmax(hourly_kw)) if hours else 0
+    return {
+        "peak_kw": peak_kw,
+        "annual_kwh": annual_kwh,
+        "hourly_kw": hourly_kw,
+        "portfolio_peak_kw": float(hourly_kw[peak_hour]) if hours else 0.0,
+        "peak_hour": peak_hour,
+    }
+
+
+def simulate_portfolio(portfolio, weather, setpoint=SETPOINT_C, chunk_bytes=CHUNK_BYTES):
+    """simulate() for a Portfolio; weather is {city: hourly temperatures}.
+    Results are in the portfolio's row order (portfolio.names)."""
+    cities = portfolio.categories("city")
+    missing = [c for c in cities if c not in weather]
+    if missing:
+        raise KeyError(f"No weather series for: {', '.join(missing)}")
+    temps = np.stack([np.asarray(weather[c], dtype=np.float64) for c in cities])
+    return simulate(portfolio.column("area"), portfolio.column("u_value"), portfolio.codes("city"),
+                    temps, setpoint, chunk_bytes)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python heating_sim.py portfolio.csv weather.csv [setpoint_c] [results.csv]")
+        sys.exit(1)
+    from portfolio_stats import iter_buildings_csv
+    portfolio = Portfolio.from_records(
+        {**r, "area": float(r["area"]), "u_value": float(r["u_value"]),
+         "monthly_energy_kwh": float(r["monthly_energy_kwh"])} for r in iter_buildings_csv(sys.argv[1]))
+    setpoint = float(sys.argv[3]) if len(sys.argv) > 3 else SETPOINT_C
+    result = simulate_portfolio(portfolio, load_weather_csv(sys.argv[2]), setpoint)
+    print(f"Buildings: {len(portfolio):,} | setpoint {setpoint:.1f} °C")
+    print(f"Annual heating demand: {result['annual_kwh'].sum():,.0f} kWh")
+    print(f"Portfolio peak: {result['portfolio_peak_kw']:,.1f} kW at hour {result['peak_hour']}")
+    if len(sys.argv) > 4:
+        with open(sys.argv[4], "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["name", "peak_kw", "annual_kwh"])
+            w.writerows(zip(portfolio.names, np.round(result["peak_kw"], 3), np.round(result["annual_kwh"], 1)))
+        print(f"Per-building results written to {sys.argv[4]}")
@@ -0,0 +1,269 @@
+# ---------------------------
+# Portfolio - column-based building storage
+# Instead of one dict per building, each field lives in its own NumPy array.
+# Text fields (city, heating_system) are stored as small integer codes plus
+# a lookup list, so filtering and grouping never touch Python dicts per row.
+# Optional indexes (hash on the text columns, sorted on u_value) answer
+# lookups and threshold queries without scanning every building.
+# ---------------------------
+
+import bisect
+import numpy as np
+
+NUMERIC_COLUMNS = ("area", "u_value", "monthly_energy_kwh")
+CATEGORY_COLUMNS = ("city", "heating_system")
+HASH_INDEX_COLUMNS = CATEGORY_COLUMNS
+SORTED_INDEX_COLUMNS = ("u_value",)
+
+
+class Portfolio:
+    """A growable, column-oriented table of buildings."""
+
+    def __init__(self, capacity=16):
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self._names = np.empty(capacity, dtype=object)
+        self._numeric = {c: np.empty(capacity, dtype=np.float64) for c in NUMERIC_COLUMNS}
+        self._codes = {c: np.empty(capacity, dtype=np.int32) for c in CATEGORY_COLUMNS}
+        self._categories = {c: [] for c in CATEGORY_COLUMNS}      # code → text
+        self._category_lookup = {c: {} for c in CATEGORY_COLUMNS}  # text → code
+        self._rows_by_name = {}
+        self._hash_index = None    # {column: {code: set of rows}} once built
+        self._sorted_index = None  # {column: (sorted values list, matching rows list)} once built
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a Portfolio from a list of building dicts (the old buildings_portfolio format)."""
+        records = list(records)
+        portfolio = cls(capacity=len(records))
+        for record in records:
+            portfolio.add(record)
+        return portfolio
+
+    # ---------------------------
+    # Adding buildings
+    # ---------------------------
+    def _grow(self):
+        capacity = len(self._names) * 2
+        self._names = np.resize(self._names, capacity)
+        for columns in (self._numeric, self._codes):
+            for name, values in columns.items():
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:self._size] = values[:self._size]
+                columns[name] = grown
+
+    def _encode(self, column, value):
+        """Return the integer code for a text value, adding it to the dictionary if new."""
+        lookup = self._category_lookup[column]
+        if value not in lookup:
+            lookup[value] = len(self._categories[column])
+            self._categories[column].append(value)
+        return lookup[value]
+
+    def add(self, building):
+        """Append one building dict; returns its row number."""
+        if building["name"] in self._rows_by_name:
+            raise ValueError(f"{building['name']} is already in the portfolio")
+        if self._size == len(self._names):
+            self._grow()
+        row = self._size
+        self._names[row] = building["name"]
+        for c in NUMERIC_COLUMNS:
+            self._numeric[c][row] = building[c]
+        for c in CATEGORY_COLUMNS:
+            self._codes[c][row] = self._encode(c, building[c])
+        self._size += 1
+        self._rows_by_name[building["name"]] = row
+        if self._hash_index is not None:
+            self._index_row(row)
+        return row
+
+    def remove(self, name):
+        """Remove a building by name. The last building moves into its row,
+        so removal is O(1) apart from the index updates."""
+        row = self._rows_by_name.pop(name)
+        last = self._size - 1
+        indexed = self._hash_index is not None
+        if indexed:
+            self._unindex_row(row)
+        if row != last:
+            if indexed:
+                self._unindex_row(last)
+            self._names[row] = self._names[last]
+            for columns in (self._numeric, self._codes):
+                for values in columns.values():
+                    values[row] = values[last]
+            self._rows_by_name[self._names[row]] = row
+            if indexed:
+                self._index_row(row)
+        self._names[last] = None
+        self._size -= 1
+
+    def __len__(self):
+        return self._size
+
+    # ---------------------------
+    # Reading columns
+    # ---------------------------
+    @property
+    def names(self):
+        return self._names[:self._size]
+
+    def column(self, name):
+        """Numeric column as a float64 array view, or a text column decoded to strings."""
+        if name in self._numeric:
+            return self._numeric[name][:self._size]
+        if name in self._codes:
+            return np.asarray(self._categories[name], dtype=object)[self.codes(name)]
+        if name == "name":
+            return self.names
+        raise KeyError(name)
+
+    def codes(self, name):
+        """Integer codes for a text column (index into categories(name))."""
+        return self._codes[name][:self._size]
+
+    def categories(self, name):
+        return list(self._categories[name])
+
+    def records(self, mask=None):
+        """Yield buildings back as dicts (optionally only the rows selected by
+        a boolean mask or an array of row numbers)."""
+        if mask is None:
+            rows = np.arange(self._size)
+        else:
+            mask = np.asarray(mask)
+            rows = np.flatnonzero(mask) if mask.dtype == bool else mask
+        for row in rows:
+            record = {"name": self._names[row]}
+            for c in NUMERIC_COLUMNS:
+                record[c] = float(self._numeric[c][row])
+            for c in CATEGORY_COLUMNS:
+                record[c] = self._categories[c][self._codes[c][row]]
+            yield record
+
+    # ---------------------------
+    # Vectorized filters (each returns a boolean mask)
+    # ---------------------------
+    def equals(self, column, value):
+        """Rows where a text column equals value."""
+        code = self._category_lookup[column].get(value)
+        if code is None:
+            return np.zeros(self._size, dtype=bool)
+        return self.codes(column) == code
+
+    def greater_than(self, column, threshold):
+        return self.column(column) > threshold
+
+    def less_than(self, column, threshold):
+        return self.column(column) < threshold
+
+    def select(self, mask):
+        """A new Portfolio holding only the rows selected by a boolean mask
+        or an array of row numbers."""
+        mask = np.asarray(mask)
+        rows = np.flatnonzero(mask) if mask.dtype == bool else mask
+        subset = Portfolio(capacity=len(rows))
+        subset._size = len(rows)
+        subset._names[:len(rows)] = self._names[rows]
+        subset._rows_by_name = {name: i for i, name in enumerate(subset.names)}
+        for c in NUMERIC_COLUMNS:
+            subset._numeric[c][:len(rows)] = self._numeric[c][rows]
+        for c in CATEGORY_COLUMNS:
+            subset._codes[c][:len(rows)] = self._codes[c][rows]
+            subset._categories[c] = list(self._categories[c])
+            subset._category_lookup[c] = dict(self._category_lookup[c])
+        return subset
+
+    # ---------------------------
+    # Indexes: built once, then kept up to date by add() and remove()
+    # ---------------------------
+    def build_indexes(self):
+        """Build the hash and sorted indexes from the current columns."""
+        self._hash_index = {}
+        for c in HASH_INDEX_COLUMNS:
+            codes = self.codes(c)
+            order = np.argsort(codes, kind="stable")
+            groups = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1) if self._size else []
+            self._hash_index[c] = {int(codes[g[0]]): set(g.tolist()) for g in groups}
+        self._sorted_index = {}
+        for c in SORTED_INDEX_COLUMNS:
+            order = np.argsort(self.column(c), kind="stable")
+            self._sorted_index[c] = (self.column(c)[order].tolist(), order.tolist())
+
+    def _ensure_indexes(self):
+        if self._hash_index is None:
+            self.build_indexes()
+
+    def _index_row(self, row):
+        for c in HASH_INDEX_COLUMNS:
+            self._hash_index[c].setdefault(int(self._codes[c][row]), set()).add(row)
+        for c in SORTED_INDEX_COLUMNS:
+            values, rows = self._sorted_index[c]
+            value = float(self._numeric[c][row])
+            pos = bisect.bisect_right(values, value)
+            values.insert(pos, value)
+            rows.insert(pos, row)
+
+    def _unindex_row(self, row):
+        for c in HASH_INDEX_COLUMNS:
+            self._hash_index[c][int(self._codes[c][row])].discard(row)
+        for c in SORTED_INDEX_COLUMNS:
+            values, rows = self._sorted_index[c]
+            value = float(self._numeric[c][row])
+            lo, hi = bisect.bisect_left(values, value), bisect.bisect_right(values, value)
+            pos = lo + rows[lo:hi].index(row)
+            del values[pos]
+            del rows[pos]
+
+    def rows_with(self, column, value):
+        """Row numbers where a text column equals value (hash index lookup)."""
+        self._ensure_indexes()
+        code = self._category_lookup[column].get(value)
+        return np.array(sorted(self._hash_index[column].get(code, ())), dtype=np.intp)
+
+    def rows_greater_than(self, column, threshold):
+        """Row numbers where column > threshold (sorted index range)."""
+        self._ensure_indexes()
+        values, rows = self._sorted_index[column]
+        return np.sort(np.array(rows[bisect.bisect_right(values, threshold):], dtype=np.intp))
+
+    def rows_less_than(self, column, threshold):
+        """Row numbers where column < threshold (sorted index range)."""
+        self._ensure_indexes()
+        values, rows = self._sorted_index[column]
+        return np.sort(np.array(rows[:bisect.bisect_left(values, threshold)], dtype=np.intp))
+
+    # ---------------------------
+    # Aggregates and group-by
+    # ---------------------------
+    def aggregate(self, column, how="sum", mask=None):
+        """sum / mean / min / max / count of a numeric column (optionally over mask)."""
+        values = self.column(column)
+        if mask is not None:
+            values = values[mask]
+        if how == "count":
+            return int(values.size)
+        if values.size == 0:
+            return 0.0 if how == "sum" else float("nan")
+        return float(getattr(np, how)(values))
+
+    def group_by(self, key, column=None, how="count"):
+        """Group by a text column in one bincount pass.
+        how: "count" (column not needed), "sum" or "mean" of a numeric column.
+        Returns {category: value} for categories that have at least one building."""
+        codes = self.codes(key)
+        n_groups = len(self._categories[key])
+        counts = np.bincount(codes, minlength=n_groups)
+        if how == "count":
+            values = counts
+        else:
+            sums = np.bincount(codes, weights=self.column(column), minlength=n_groups)
+            if how == "sum":
+                values = sums
+            elif how == "mean":
+                values = sums / np.maximum(counts, 1)
+            else:
+                raise ValueError(f"Unsupported aggregation: {how}")
+        return {self._categories[key][code]: values[code].item()
+                for code in np.flatnonzero(counts)}
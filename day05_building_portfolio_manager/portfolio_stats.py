@@ -0,0 +1,115 @@
+# ---------------------------
+# One-pass portfolio statistics
+# Reads buildings one at a time (from a list, a Portfolio or a CSV file) and
+# keeps only running totals, so a portfolio file bigger than RAM can still
+# be summarized. Memory grows with the number of cities / heating systems,
+# never with the number of buildings.
+# ---------------------------
+
+import csv, sys
+
+NUMERIC_FIELDS = ("area", "u_value", "monthly_energy_kwh")
+
+
+class RunningStats:
+    """count / sum / min / max / mean of a stream of numbers."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def update(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+
+class PortfolioStats:
+    """Everything the portfolio report needs, collected in a single pass."""
+
+    def __init__(self, cost_per_kwh=0.25):
+        self.cost_per_kwh = cost_per_kwh
+        self.count = 0
+        self.fields = {f: RunningStats() for f in NUMERIC_FIELDS}
+        self.city_counts = {}
+        self.energy_by_heating_system = {}
+
+    def update(self, building):
+        """Fold one building record (a dict) into the running totals."""
+        self.count += 1
+        for f in NUMERIC_FIELDS:
+            self.fields[f].update(float(building[f]))
+        city = building["city"]
+        self.city_counts[city] = self.city_counts.get(city, 0) + 1
+        system = building["heating_system"]
+        self.energy_by_heating_system[system] = (
+            self.energy_by_heating_system.get(system, 0.0) + float(building["monthly_energy_kwh"]))
+        return self
+
+    def consume(self, buildings):
+        """Fold a whole iterator of building records; returns self."""
+        for building in buildings:
+            self.update(building)
+        return self
+
+    @property
+    def cost_by_heating_system(self):
+        return {system: kwh * self.cost_per_kwh for system, kwh in self.energy_by_heating_system.items()}
+
+    @property
+    def total_energy(self):
+        return self.fields["monthly_energy_kwh"].total
+
+    @property
+    def total_cost(self):
+        return self.total_energy * self.cost_per_kwh
+
+    def summary(self):
+        """Plain dict of the results (handy for printing or saving as JSON)."""
+        return {
+            "count": self.count,
+            **{f: {"sum": s.total, "mean": s.mean, "min": s.min, "max": s.max} for f, s in self.fields.items()},
+            "city_counts": dict(self.city_counts),
+            "energy_by_heating_system": dict(self.energy_by_heating_system),
+            "cost_by_heating_system": self.cost_by_heating_system,
+            "total_energy_kwh": self.total_energy,
+            "total_cost_eur": self.total_cost,
+        }
+
+
+def iter_buildings_csv(path):
+    """Stream building records from a CSV with columns
+    name,area,u_value,city,heating_system,monthly_energy_kwh."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def summarize_file(path, cost_per_kwh=0.25):
+    return PortfolioStats(cost_per_kwh).consume(iter_buildings_csv(path))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python portfolio_stats.py portfolio.csv [cost_per_kwh]")
+        sys.exit(1)
+    stats = summarize_file(sys.argv[1], float(sys.argv[2]) if len(sys.argv) > 2 else 0.25)
+    u = stats.fields["u_value"]
+    print(f"Buildings: {stats.count:,}")
+    print(f"U-value: mean {u.mean:.3f}, min {u.min:.3f}, max {u.max:.3f} W/m²·K")
+    print("Buildings by city:")
+    for city, count in stats.city_counts.items():
+        print(f"  {city}: {count:,}")
+    print("Monthly energy / cost by heating system:")
+    costs = stats.cost_by_heating_system
+    for system, kwh in stats.energy_by_heating_system.items():
+        print(f"  {system}: {kwh:,.0f} kWh = €{costs[system]:,.2f}")
+    print(f"Total: {stats.total_energy:,.0f} kWh = €{stats.total_cost:,.2f}")
@@ -0,0 +1,56 @@
+# ---------------------------
+# Monthly portfolio costs from a time-of-use tariff
+# Reads the same tariff.json format as the Day 4 tariff engine (bands with
+# days/hours and a rate, a default rate, a standing charge per day and monthly
+# tier blocks). The portfolio only has monthly kWh per building, not interval
+# readings, so each building's usage is spread evenly over the 168 hours of the
+# week: the energy price is the week's average rate, tiers apply to the monthly
+# total, plus the standing charge for the month's days.
+# Day 4's tariff.py has the same rules (CompiledTariff.price_monthly); its
+# bench_tariff.py checks that both give the same rates and costs.
+# ---------------------------
+
+import json
+import numpy as np
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+HOURS_PER_WEEK = 168
+
+
+def _days(spec):
+    """"mon-fri", "sat,sun", ["mon", "wed"] → day numbers (Monday = 0)."""
+    days = set()
+    for part in spec.split(",") if isinstance(spec, str) else spec:
+        first, _, last = part.strip().lower().partition("-")
+        a = DAYS.index(first[:3])
+        b = DAYS.index(last[:3]) if last else a
+        days.update(range(a, b + 1) if a <= b else list(range(a, 7)) + list(range(0, b + 1)))
+    return days
+
+
+def weekly_rates(tariff):
+    """Rate (€/kWh) for every hour of the week, Monday 00:00 first. Later bands win;
+    a band like [23, 8] runs past midnight into the next day."""
+    rates = np.full(HOURS_PER_WEEK, float(tariff.get("default_rate", 0.0)))
+    for band in tariff.get("bands", []):
+        start, end = (int(h) for h in band.get("hours", [0, 24]))
+        length = end - start if start < end else 24 - start + end
+        for day in _days(band.get("days", "mon-sun")):
+            rates[(day * 24 + start + np.arange(length)) % HOURS_PER_WEEK] = float(band["rate"])
+    return rates
+
+
+def load_tariff(path="tariff.json"):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def monthly_costs(tariff, monthly_kwh, days=30):
+    """Cost (€) per building for a month, from its monthly kWh (an array)."""
+    kwh = np.asarray(monthly_kwh, dtype=np.float64)
+    cost = kwh * weekly_rates(tariff).mean() + float(tariff.get("standing_charge_per_day", 0.0)) * days
+    tiers = sorted(tariff.get("tiers", []), key=lambda t: t["from_kwh"])
+    bounds = [float(t["from_kwh"]) for t in tiers] + [np.inf]
+    for tier, lo, hi in zip(tiers, bounds, bounds[1:]):
+        cost += float(tier["adder"]) * np.clip(np.minimum(kwh, hi) - lo, 0.0, None)  # kWh inside this block
+    return cost
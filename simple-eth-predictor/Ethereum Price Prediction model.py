@@ -7,16 +7,19 @@
 #  - Make a single 1-day-ahead forecast
 #  - One clear plot so I can see what's going on
 
+import argparse                          # command-line flags (run report / cProfile output)
 import math                              # math.sqrt for RMSE and other math utilities
-import requests                          # to call the Binance REST API over HTTP
+import time                              # current time in ms (to tell finished candles from today's)
 import numpy as np                       # numerical tools (arrays, simple stats)
 import pandas as pd                      # to store and transform table-like data
-import matplotlib.pyplot as plt          # to make the line chart
+# requests, scikit-learn and matplotlib are imported inside the functions that use them:
+# they take a second or two to load, and short runs (--help, offline, no chart) don't need them
 
-from sklearn.pipeline import make_pipeline          # to chain preprocessing + model
-from sklearn.preprocessing import StandardScaler    # to standardize features (mean 0, std 1)
-from sklearn.linear_model import LinearRegression   # simple linear model for regression
-from sklearn.metrics import mean_squared_error, mean_absolute_error  # evaluation metrics
+from candle_store import CandleStore, klines_to_columns  # local on-disk cache of downloaded candles
+from online_features import OnlineFeatures, FeatureWindows  # constant-time rolling feature windows
+from walk_forward import walk_forward, summarize as summarize_walk_forward  # many-split backtest
+from stage_profiler import StageProfiler                 # time / memory per pipeline step
+from timeline_chart import ChartWriter, draw_timeline, is_headless, save_timeline  # chart drawing (matplotlib loaded lazily)
 
 import warnings                          # to control warning messages
 warnings.filterwarnings("ignore")        # hide warnings so the console output stays clean
@@ -25,34 +28,63 @@ warnings.filterwarnings("ignore")        # hide warnings so the console output s
 # -----------------------------
 # 1) Data: fetch ETH/USDT daily from Binance
 # -----------------------------
-def fetch_eth_daily(days=365, symbol="ETHUSDT"):     # define a function with defaults: 365 days, ETH/USDT pair
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"   # Binance spot market klines endpoint
+
+
+def fetch_eth_daily(days=365, symbol="ETHUSDT", store=None, offline=False, url=BINANCE_KLINES_URL):
     """
     Grab daily OHLCV candles from Binance's public endpoint.
     I only keep 'close' (as price) and 'volume' to keep this beginner-friendly.
+    Closed candles are saved in a local CandleStore (candle_store.py), so later runs only
+    download candles after the last stored close_time, and offline=True (or no network)
+    works straight from the cache. If the cache has fewer candles than `days` (say an
+    earlier run asked for 30), the older ones are downloaded and put in front of it.
+    url can point at a local stand-in server for testing.
     """
     print("Fetching daily ETH/USDT candles from Binance...")  
 
-    url = "https://api.binance.com/api/v3/klines"   # Binance spot market klines endpoint
-    params = {                                      # query parameters for the request
-        "symbol": symbol.upper(),                   # the trading pair, uppercase just in case
-        "interval": "1d",                           # 1 day candles
-        "limit": int(min(max(days, 2), 1000))       # number of rows: between 2 and 1000
-    }
-    headers = {"User-Agent": "Day6-ETH-Predictor/1.0 (learning project)"}  
-
-    r = requests.get(url, params=params, headers=headers, timeout=20)  # make the HTTP GET request
-    r.raise_for_status()                                   # if HTTP status is not OK, raise an error
-    raw = r.json()                                         # parse the response as JSON 
-
-    cols = [                                               # names for the columns Binance returns
-        "open_time","open","high","low","close","volume","close_time",
-        "quote_asset_volume","num_trades","taker_buy_base","taker_buy_quote","ignore"
-    ]
-    df = pd.DataFrame(raw, columns=cols)                   # build a pandas DataFrame with those names
-
-    # convert number-like strings to floats (Binance sends numbers as strings)
-    for c in ["open","high","low","close","volume","quote_asset_volume","taker_buy_base","taker_buy_quote"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")      # convert; non-numeric becomes NaN
+    symbol = symbol.upper()                                # the trading pair, uppercase just in case
+    store = store if store is not None else CandleStore()  # default cache folder: ./candle_cache
+    last_close = store.last_close_time(symbol, "1d")       # newest candle I already have (None on first run)
+    live = None                                            # today's still-open candle (never cached)
+
+    if not offline:
+        import requests                                    # to call the Binance REST API over HTTP
+        params = {                                         # query parameters for the request
+            "symbol": symbol,
+            "interval": "1d",                              # 1 day candles
+            "limit": int(min(max(days, 2), 1000))          # number of rows: between 2 and 1000
+        }
+        if last_close is not None:                         # cache hit: only ask for what's new
+            params["startTime"] = last_close + 1
+            params["limit"] = 1000
+        headers = {"User-Agent": "Day6-ETH-Predictor/1.0 (learning project)"}  
+
+        try:
+            r = requests.get(url, params=params, headers=headers, timeout=20)  # make the HTTP GET request
+            r.raise_for_status()                           # if HTTP status is not OK, raise an error
+            fresh = klines_to_columns(r.json())            # JSON → one typed NumPy array per column
+            closed = fresh["close_time"] < int(time.time() * 1000)  # candles that are finished
+            added = store.append(symbol, "1d", {c: v[closed] for c, v in fresh.items()})
+            live = {c: v[~closed] for c, v in fresh.items()}
+            print(f"Downloaded {len(closed)} candles ({added} new saved to the cache)")
+            missing = max(days, 2) - int((~closed).sum()) - store.count(symbol, "1d")
+            if missing > 0 and store.count(symbol, "1d"):      # cache is shorter than asked for
+                older = backfill_eth_daily(store, symbol, missing, url, headers)
+                print(f"Downloaded {older} older candles to fill the cache back to {days} days")
+        except requests.RequestException as e:             # no network / API error
+            if last_close is None:
+                raise                                      # nothing cached to fall back on
+            print(f"Download failed ({e}); using cached candles only.")
+
+    n_live = 0 if live is None else len(live["close_time"])
+    cols = store.load(symbol, "1d", last=max(days, 2) - n_live)  # newest closed candles from disk
+    if n_live:
+        cols = {c: np.concatenate([cols[c], live[c]]) for c in cols}  # add today's open candle on the end
+    if len(cols["close_time"]) == 0:
+        raise RuntimeError(f"No cached candles for {symbol} yet; run once with network access.")
+
+    df = pd.DataFrame(cols)                                # columns are already numbers (no pd.to_numeric needed)
 
     # use close_time (ms) as the daily timestamp and convert to timezone-aware UTC datetime
     df["date"] = pd.to_datetime(df["close_time"], unit="ms", utc=True)
@@ -67,6 +99,36 @@ def fetch_eth_daily(days=365, symbol="ETHUSDT"):     # define a function with de
     return df                                              # hand back the tidy DataFrame
 
 
+def backfill_eth_daily(store, symbol, missing, url=BINANCE_KLINES_URL, headers=None):
+    """
+    Download up to `missing` daily candles from before the oldest cached one, paging
+    backwards with endTime (1000 per request), and put them in front of the cache
+    with CandleStore.prepend. Stops early when the pair has no older history.
+    Returns the number of candles added.
+    """
+    import tempfile                                        # staging folder for the older candles
+    import requests                                        # to call the Binance REST API over HTTP
+    pages = []                                             # newest page first while paging back
+    end = store.first_open_time(symbol, "1d") - 1          # everything before my oldest candle
+    while missing > 0:
+        params = {"symbol": symbol, "interval": "1d", "endTime": end, "limit": int(min(missing, 1000))}
+        r = requests.get(url, params=params, headers=headers, timeout=20)
+        r.raise_for_status()
+        page = klines_to_columns(r.json())
+        if len(page["open_time"]):
+            pages.append(page)
+            missing -= len(page["open_time"])
+            end = int(page["open_time"][0]) - 1            # next request: the candles before this page
+        if len(page["open_time"]) < params["limit"]:       # fewer than asked: reached the first day
+            break
+    if not pages:
+        return 0
+    with tempfile.TemporaryDirectory() as folder:
+        older = CandleStore(folder)
+        older.append(symbol, "1d", {c: np.concatenate([p[c] for p in reversed(pages)]) for c in pages[0]})
+        return store.prepend(symbol, "1d", older)
+
+
 # -----------------------------
 # 2) Features: keep them small and sensible
 # -----------------------------
@@ -116,14 +178,23 @@ def train_and_evaluate(X, y, dates, train_ratio=0.8):     # function to train an
     Time-ordered split (first part train, last part test).
     Model: StandardScaler + LinearRegression (simple and fair).
     I also report a naïve baseline: tomorrow = today.
+    X is turned into ONE contiguous float64 array; train/test are views (slices) into it,
+    so nothing gets copied per split. The result has that array plus the two row ranges.
     """
     print("Training model...")
+    from sklearn.pipeline import make_pipeline          # to chain preprocessing + model
+    from sklearn.preprocessing import StandardScaler    # to standardize features (mean 0, std 1)
+    from sklearn.linear_model import LinearRegression   # simple linear model for regression
+    from sklearn.metrics import mean_squared_error, mean_absolute_error  # evaluation metrics
 
     n = len(X)                                            # number of rows
     split = int(n * train_ratio)                          # index where train ends and test begins
 
-    X_train, X_test = X.iloc[:split], X.iloc[split:]      # earlier rows for training, later for test
-    y_train, y_test = y.iloc[:split], y.iloc[split:]      # same split for target
+    X_arr = np.ascontiguousarray(X.to_numpy(dtype=np.float64))  # one float64 block for every row
+    y_arr = np.ascontiguousarray(np.asarray(y, dtype=np.float64))  # same for the target
+    train, test = slice(0, split), slice(split, n)        # row ranges instead of copies
+    X_train, X_test = X_arr[train], X_arr[test]           # views: earlier rows for training, later for test
+    y_train, y_test = y_arr[train], y_arr[test]           # same split for target
 
     # dates is a DatetimeIndex; use direct positional indexing (no .iloc on an index)
     train_start, train_end = dates[0], dates[split - 1]   # first and last train dates
@@ -143,13 +214,13 @@ def train_and_evaluate(X, y, dates, train_ratio=0.8):     # function to train an
     test_mae   = mean_absolute_error(y_test, yhat_test)               # MAE test
 
     # naïve baseline: predict tomorrow as today for the test set (shift actuals back one)
-    naive = y_test.shift(1).bfill().values                       # baseline predictions
+    naive = np.concatenate((y_test[:1], y_test[:-1]))             # baseline predictions (yesterday's actual)
     naive_rmse = math.sqrt(mean_squared_error(y_test, naive))     # RMSE of baseline
     rmse_lift  = naive_rmse - test_rmse                           # positive = our model beats baseline
 
     # directional accuracy: did we at least get up/down correct vs today’s price?
-    todays_price = y_test.shift(1).bfill().values                 # “today” aligned to each “tomorrow”
-    actual_up = (y_test.values > todays_price)                    # True/False for actual up move
+    todays_price = naive                                          # “today” aligned to each “tomorrow”
+    actual_up = (y_test > todays_price)                           # True/False for actual up move
     pred_up   = (yhat_test > todays_price)                        # True/False for predicted up move
     dir_acc   = np.mean(actual_up == pred_up) * 100.0             # percent correct
 
@@ -162,6 +233,7 @@ def train_and_evaluate(X, y, dates, train_ratio=0.8):     # function to train an
 
     return {                                             # return everything the rest of the script needs
         "model": model,
+        "X": X_arr, "y": y_arr, "train": train, "test": test,   # full arrays + row ranges (no copies)
         "y_train": y_train, "y_test": y_test,
         "yhat_train": yhat_train, "yhat_test": yhat_test,
         "dates_train": dates[:split], "dates_test": dates[split:]
@@ -171,54 +243,121 @@ def train_and_evaluate(X, y, dates, train_ratio=0.8):     # function to train an
 # -----------------------------
 # 4) One simple plot (timeline) + a 1-day-ahead forecast
 # -----------------------------
-def plot_timeline(res):                                   # draw one figure showing train/test actual vs predicted
+def plot_timeline(res, save_to=None, charts=None):       # draw one figure showing train/test actual vs predicted
+    """
+    Opens a chart window, unless there's no display (batch servers) or save_to is given:
+    then the chart is written to save_to (PNG/SVG, default eth_timeline.png) by `charts`,
+    a ChartWriter that renders in the background while the script carries on.
+    """
     print("Plotting timeline...")
-    plt.figure(figsize=(12, 5))                           # set the size so labels are readable
-    plt.plot(res["dates_train"], res["y_train"], label="Actual (train)")      # train actual
-    plt.plot(res["dates_train"], res["yhat_train"], label="Predicted (train)")# train predictions
-    plt.plot(res["dates_test"],  res["y_test"],  label="Actual (test)")       # test actual
-    plt.plot(res["dates_test"],  res["yhat_test"], label="Predicted (test)")  # test predictions
-    if len(res["dates_test"]) > 0:                        # if there is a test set,
-        plt.axvline(res["dates_test"][0], linestyle="--", label="Test start") # mark where it starts
-    plt.title("ETH/USDT — Tomorrow's Close (simple model)")  # chart title
-    plt.ylabel("Price (USDT)")                             # y-axis label
-    plt.legend()                                           # show legend
-    plt.tight_layout()                                     # tidy up spacing
-    plt.show()                                             # render the plot
+    series = (res["dates_train"], res["y_train"], res["yhat_train"],   # train actual + predictions
+              res["dates_test"], res["y_test"], res["yhat_test"])      # test actual + predictions
+    if save_to is None and not is_headless():             # normal desktop run: show a window
+        import matplotlib.pyplot as plt                   # imported only when a chart is really shown
+        fig = plt.figure(figsize=(12, 5))                 # set the size so labels are readable
+        draw_timeline(fig, *series)                       # lines, test-start marker, title, legend
+        plt.show()                                        # render the plot
+        return None
+    path = save_to or "eth_timeline.png"                  # headless: write a file instead of blocking
+    if charts is None:
+        return save_timeline(path, *series)               # no background writer: save right here
+    charts.submit(save_timeline, path, *series)           # rendered in a background process
+    print(f"Chart will be saved to {path}")
+    return path
+
+
+def forecast_tomorrow(model, state):                      # small helper to predict 1 day ahead
+    """
+    Quick 1-step-ahead forecast from the latest candle: the first step of forecast_horizon,
+    so it always matches day 1 of the multi-day forecast.
+    (The last row of X can't be used: its target is the latest close, which is already known.)
+    """
+    return float(forecast_horizon(model, state, 1)[0])    # one step, returned as a float
 
 
-def forecast_tomorrow(model, X_full):                     # small helper to predict 1 day ahead
+def forecast_horizon(model, state, h):                    # roll the model forward h days
     """
-    Quick 1-step-ahead forecast using the latest feature row.
-    Multi-day forecasting is for later once I'm comfortable updating features step-by-step.
+    Multi-day forecast, one step at a time: each prediction becomes the next day's price
+    and the features are updated from the small rolling window in `state` (an OnlineFeatures
+    from online_features.py), so no DataFrame gets rebuilt per step.
+    Future volume is unknown, so I hold it at the 7-day average.
+    state can also be a list of states (e.g. one per symbol): they all step forward together
+    as one NumPy batch. model is one model for every state, or a list with one model per state.
+    Returns h predictions (shape (h,)), or shape (len(state), h) for a list of states.
     """
-    last_row = X_full.iloc[-1].values                     # take the last available feature row
-    return float(model.predict([last_row])[0])            # run one prediction and return as a float
+    single = isinstance(state, OnlineFeatures)            # one symbol or a batch?
+    windows = FeatureWindows.from_states([state] if single else list(state))  # stack the windows as arrays
+    preds = np.empty((len(windows), h))                   # one row per state, one column per day ahead
+    for step in range(h):
+        X_step = windows.features()                       # today's features for every state
+        if isinstance(model, (list, tuple)):              # a separate model per state
+            preds[:, step] = [float(m.predict(X_step[i:i + 1])[0]) for i, m in enumerate(model)]
+        else:                                             # one model: a single predict call for the batch
+            preds[:, step] = model.predict(X_step)
+        windows.push(preds[:, step], windows.average_volume())  # prediction becomes tomorrow's price
+    return preds[0] if single else preds
 
 
 # -----------------------------
 # 5) Main
 # -----------------------------
-def main():                                               # the script’s entry point
+def main(report_path=None, cprofile_dir=None, plot_to=None):  # the script’s entry point
+    """
+    report_path: save per-stage timings/memory as JSON (or Prometheus text for .prom/.txt)
+    cprofile_dir: also dump a cProfile file per stage into this folder
+    plot_to: save the chart to this PNG/SVG file (in the background) instead of opening a window
+    """
     print("=== Day 6: Simple ETH Price Predictor ===\n")  # header in console
+    profiler = StageProfiler(cprofile_dir=cprofile_dir)   # wall/CPU time + peak memory per step
+    charts = ChartWriter()                                # headless charts get written in the background
 
     # Step 1: data
-    df = fetch_eth_daily(days=365, symbol="ETHUSDT")      # download ~1 year of daily candles
+    with profiler.stage("fetch") as st:
+        df = fetch_eth_daily(days=365, symbol="ETHUSDT")  # download ~1 year of daily candles
+        st["rows"] = len(df)
 
     # Step 2: features
-    X, y, dates = build_features(df)                      # build feature matrix X and target y
+    with profiler.stage("build_features") as st:
+        X, y, dates = build_features(df)                  # build feature matrix X and target y
+        st["rows"] = len(X)
 
     # Step 3: train + evaluate
-    res = train_and_evaluate(X, y, dates, train_ratio=0.8) # 80% train, 20% test (time-ordered)
+    with profiler.stage("train_and_evaluate", rows=len(X)):
+        res = train_and_evaluate(X, y, dates, train_ratio=0.8) # 80% train, 20% test (time-ordered)
+    del X, y                                              # res["X"] / res["y"] are the same numbers as one float64 block; don't keep both
+    n_rows = len(res["X"])                                # row count for the later stages
+
+    # Step 3b: walk-forward check (many weekly test windows instead of one split)
+    with profiler.stage("walk_forward", rows=n_rows):
+        wf = summarize_walk_forward(walk_forward(res["X"], res["y"], dates, test_size=7))  # few folds, so they run in-process
+    print(f"Walk-forward ({wf['folds']} weekly folds): RMSE ${wf['rmse']:.2f} | MAE ${wf['mae']:.2f} | "
+          f"lift vs naïve ${wf['lift']:.2f} (beat naïve in {wf['beat_naive_pct']:.0f}% of folds) | "
+          f"direction {wf['dir_acc']:.1f}%")
 
     # Step 4: one clean plot
-    plot_timeline(res)                                    # visualize model vs actual over time
+    with profiler.stage("plot_timeline", rows=n_rows):
+        plot_timeline(res, save_to=plot_to, charts=charts)  # visualize model vs actual over time
 
-    # Step 5: 1-day-ahead forecast from latest features
-    X_full = pd.concat([X.loc[res["dates_train"]], X.loc[res["dates_test"]]]) # rebuild X in date order
-    pred = forecast_tomorrow(res["model"], X_full)        # predict tomorrow’s close using the last row
+    # Step 5: 1-day-ahead forecast from the latest candle
+    with profiler.stage("forecast_tomorrow", rows=1):
+        state = OnlineFeatures.from_history(df["price"], df["volume"])   # warm the rolling windows up
+        pred = forecast_tomorrow(res["model"], state)     # predict tomorrow’s close from today's candle
     print(f"\nTomorrow's close forecast (ETH/USDT): {pred:.2f}")  # print the number
 
+    # Step 6: roll forward a week from the same candle (features updated step by step)
+    with profiler.stage("forecast_horizon", rows=7):
+        week = forecast_horizon(res["model"], state, 7)   # 7 recursive 1-day steps; day 1 = pred
+    print("Next 7 days: " + ", ".join(f"{p:.2f}" for p in week))
+
+    for path in charts.close():                           # make sure background charts are finished
+        print(f"Chart saved to {path}")
+    profiler.close()                                      # stop tracking memory
+    print("\nWhere the time went:")
+    print(profiler.summary())
+    print(f"Peak memory (tracemalloc): {profiler.peak_bytes / 1e6:.1f} MB")
+    if report_path:
+        print(f"Run report saved to {profiler.write(report_path)}")
+
     # wrap up with a learning summary
     print("\nWhat I learned today:")
     print("- How to fetch real daily crypto data and turn it into a tidy DataFrame")
@@ -228,4 +367,9 @@ def main():                                               # the script’s entry
 
 
 if __name__ == "__main__":                                # only run main() if this file is executed directly
-    main()                                                # call main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Simple ETH price predictor")
+    parser.add_argument("--report", help="save stage timings to this file (.json, or .prom for Prometheus)")
+    parser.add_argument("--cprofile", metavar="DIR", help="dump a cProfile file per stage into DIR")
+    parser.add_argument("--plot-to", metavar="FILE", help="save the chart (.png / .svg) instead of showing it")
+    args = parser.parse_args()
+    main(report_path=args.report, cprofile_dir=args.cprofile, plot_to=args.plot_to)  # call main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+# Check + benchmark: multi_symbol (one batched fit) vs looping the single-symbol pipeline
+#  - loop: build_features + train_and_evaluate once per symbol (the current script's functions)
+#  - batched: build_features_many + train_and_evaluate_many for every symbol at once
+#  - every 10th symbol is listed later (a third of the candles missing at the start),
+#    so the batched version has to fit each symbol on its own rows
+#  - checks that both give the same per-symbol metrics, then prints the timings
+# Run: python bench_multi_symbol.py [symbols] [candles]
+
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import load_predictor, synthetic_candles
+from multi_symbol import build_features_many, train_and_evaluate_many
+
+
+def main():
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    predictor = load_predictor()
+    frames = {f"SYM{i:02d}USDT": synthetic_candles(n, seed=i).iloc[n // 3 if i % 10 == 9 else 0:]
+              for i in range(n_symbols)}
+
+    # loop over the single-symbol functions (their prints are swallowed)
+    start = time.perf_counter()
+    looped = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for symbol, df in frames.items():
+            X, y, dates = predictor.build_features(df)
+            res = predictor.train_and_evaluate(X, y, dates)
+            y_test, yhat = res["y_test"], res["yhat_test"]
+            looped[symbol] = [np.sqrt(np.mean((y_test - yhat) ** 2)), np.mean(np.abs(y_test - yhat))]
+    loop_s = time.perf_counter() - start
+
+    # batched: one wide table, one 3-D stack, one solve
+    start = time.perf_counter()
+    prices = pd.DataFrame({s: df["price"] for s, df in frames.items()})
+    volumes = pd.DataFrame({s: df["volume"] for s, df in frames.items()})
+    X, y, dates, symbols = build_features_many(prices, volumes)
+    report, _, _ = train_and_evaluate_many(X, y, symbols)
+    batch_s = time.perf_counter() - start
+
+    expected = np.array([looped[s] for s in symbols])
+    got = report[["rmse", "mae"]].to_numpy()
+    print(f"{n_symbols} symbols x {n:,} candles  (stack {X.shape})")
+    print(f"Max relative metric difference: {(np.abs(got - expected) / expected).max():.3e}")
+    assert np.allclose(got, expected, rtol=1e-8), "batched fit disagrees with the per-symbol pipeline"
+    print(f"Loop over build_features + train_and_evaluate: {loop_s * 1000:10.1f} ms")
+    print(f"Batched multi_symbol:                          {batch_s * 1000:10.1f} ms  ({loop_s / batch_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
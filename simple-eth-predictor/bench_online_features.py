@@ -0,0 +1,55 @@
+# Check + benchmark: OnlineFeatures vs the batch build_features
+#  - feeds candles one at a time and compares every feature row with build_features
+#  - times "one new candle arrives" for both approaches
+# Run: python bench_online_features.py [candles]
+
+import sys
+import time
+
+import numpy as np
+
+from bench_utils import load_predictor, synthetic_candles
+from online_features import FEATURES, OnlineFeatures
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    predictor = load_predictor()
+    df = synthetic_candles(n)
+
+    # batch features (the last candle has no target, so build_features drops it)
+    X, _, dates = predictor.build_features(df)
+    assert list(X.columns) == FEATURES
+
+    state = OnlineFeatures()
+    rows = {}
+    for date, price, volume in zip(df.index, df["price"], df["volume"]):
+        row = state.update(price, volume)
+        if row is not None:
+            rows[date] = row
+    online = np.array([rows[d] for d in dates])
+    diff = np.abs(online - X.values)
+    print(f"Compared {len(dates):,} rows x {len(FEATURES)} features")
+    print(f"Max abs difference: {diff.max():.3e}   max relative: {(diff / np.abs(X.values)).max():.3e}")
+    assert np.allclose(online, X.values, rtol=1e-10, atol=1e-12), "online features drifted from build_features"
+
+    # one new candle: batch has to rebuild everything, online is a single update
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predictor.build_features(df)
+    batch_s = (time.perf_counter() - start) / repeats
+
+    warm = OnlineFeatures.from_history(df["price"], df["volume"])
+    prices, volumes = df["price"].tolist(), df["volume"].tolist()
+    start = time.perf_counter()
+    for price, volume in zip(prices, volumes):
+        warm.update(price, volume)
+    online_s = (time.perf_counter() - start) / n
+
+    print(f"Batch rebuild per new candle:   {batch_s * 1e6:12,.1f} µs")
+    print(f"Online update per new candle:   {online_s * 1e6:12,.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Check + benchmark: OnlineLinearModel (RLS) vs refitting the sklearn pipeline
+#  - batch-fit on the first half, stream the rest one row at a time with partial_fit
+#  - compare predictions/coefficients with a full StandardScaler + LinearRegression fit
+#  - time one new row: partial_fit vs a full refit
+# Run: python bench_online_model.py [candles]
+
+import sys
+import time
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from bench_utils import load_predictor, synthetic_candles
+from online_model import OnlineLinearModel
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    predictor = load_predictor()
+    X, y, _ = predictor.build_features(synthetic_candles(n))
+    X, y = X.values, y.values
+    half = len(X) // 2
+
+    batch = make_pipeline(StandardScaler(), LinearRegression()).fit(X, y)
+
+    online = OnlineLinearModel(X.shape[1]).fit(X[:half], y[:half])
+    start = time.perf_counter()
+    for row, target in zip(X[half:], y[half:]):
+        online.partial_fit(row, target)
+    update_s = (time.perf_counter() - start) / (len(X) - half)
+
+    pred_diff = np.abs(online.predict(X) - batch.predict(X)).max()
+    lr = batch[-1]
+    coef_batch = lr.coef_ / batch[0].scale_
+    print(f"Rows: {len(X):,} ({half:,} batch warm-up + {len(X) - half:,} streamed)")
+    print(f"Max prediction difference vs batch fit: {pred_diff:.3e}")
+    print(f"Max coefficient difference (raw units): {np.abs(online.coef_ - coef_batch).max():.3e}")
+    assert np.allclose(online.predict(X), batch.predict(X), rtol=1e-8, atol=1e-6)
+
+    cold = OnlineLinearModel(X.shape[1])
+    for row, target in zip(X, y):
+        cold.partial_fit(row, target)
+    print(f"Cold start (no batch fit) max prediction difference: {np.abs(cold.predict(X) - batch.predict(X)).max():.3e}")
+
+    repeats = 50
+    start = time.perf_counter()
+    for _ in range(repeats):
+        make_pipeline(StandardScaler(), LinearRegression()).fit(X, y)
+    refit_s = (time.perf_counter() - start) / repeats
+    print(f"Full refit per new row:  {refit_s * 1e6:10,.1f} µs")
+    print(f"partial_fit per new row: {update_s * 1e6:10,.1f} µs")
+
+    forgetful = OnlineLinearModel(X.shape[1], lam=0.99).fit(X[:half], y[:half])
+    for row, target in zip(X[half:], y[half:]):
+        forgetful.partial_fit(row, target)
+    print(f"lam=0.99 last-100-rows RMSE: {np.sqrt(np.mean((forgetful.predict(X[-100:]) - y[-100:]) ** 2)):.2f} "
+          f"(lam=1: {np.sqrt(np.mean((online.predict(X[-100:]) - y[-100:]) ** 2)):.2f})")
+
+
+if __name__ == "__main__":
+    main()
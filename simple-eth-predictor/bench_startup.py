@@ -0,0 +1,58 @@
+# Startup-time check for the predictor script
+#  - runs `python -X importtime "Ethereum Price Prediction model.py" --help` in a fresh
+#    interpreter a few times and takes the median import time
+#  - prints the slowest modules, and exits with status 1 when the import time is over
+#    the budget or when a module that should load lazily (requests, scikit-learn,
+#    matplotlib) gets imported before it's needed
+# Run: python bench_startup.py [budget_ms]
+
+import os
+import statistics
+import subprocess
+import sys
+
+from bench_utils import PREDICTOR_PATH
+
+BUDGET_MS = 1000          # numpy + pandas are most of this; they're needed by every real run
+RUNS = 5
+MUST_BE_LAZY = ["requests", "sklearn", "scipy", "matplotlib"]
+
+
+def import_times(args):
+    """{module: (cumulative import µs, nested?)} for one fresh `python -X importtime <args>`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=os.path.dirname(PREDICTOR_PATH),
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(cumulative), name.startswith("  "))  # nested imports are indented
+    return times
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    baseline = import_times(["-c", "pass"])              # what the interpreter loads anyway (site, encodings, ...)
+    runs = [import_times([PREDICTOR_PATH, "--help"]) for _ in range(RUNS)]
+    totals = [sum(t for name, (t, nested) in run.items() if not nested and name not in baseline) / 1000
+              for run in runs]
+    total = statistics.median(totals)
+
+    print(f"Predictor startup imports: {total:.1f} ms (median of {RUNS}, budget {budget:.0f} ms)")
+    top_level = [(t, name) for name, (t, nested) in runs[-1].items() if not nested and name not in baseline]
+    for t, name in sorted(top_level, reverse=True)[:8]:
+        print(f"  {t / 1000:8.1f} ms  {name}")
+
+    eager = [m for m in MUST_BE_LAZY if m in runs[-1] and m not in baseline]
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+    if total > budget:
+        print("FAIL: over the startup budget")
+    if eager or total > budget:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# Shared helpers for the bench_*.py scripts
+#  - load_predictor(): import "Ethereum Price Prediction model.py" (its file name
+#    has spaces, so a normal import statement can't load it)
+#  - synthetic_candles(): offline price/volume data shaped like fetch_eth_daily's output
+
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+PREDICTOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Ethereum Price Prediction model.py")
+
+
+def load_predictor():
+    """The predictor script as a module (its main() only runs when executed directly)."""
+    spec = importlib.util.spec_from_file_location("eth_price_prediction_model", PREDICTOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_candles(n=1000, seed=0, freq="D", start="2020-01-01"):
+    """A random-walk price + volume DataFrame with a UTC DatetimeIndex named "date"."""
+    rng = np.random.default_rng(seed)
+    price = 2000.0 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    volume = rng.lognormal(12, 0.4, n)
+    index = pd.date_range(start, periods=n, freq=freq, tz="UTC", name="date")
+    return pd.DataFrame({"price": price, "volume": volume}, index=index)
@@ -0,0 +1,158 @@
+# Local candle store for the ETH predictor
+# What this does:
+#  - keeps every downloaded kline on disk, one folder per (symbol, interval)
+#  - each column is its own little-endian binary file (open_time.bin, close.bin, ...)
+#    so appending is just writing bytes at the end and loading is a memmap
+#  - lets the predictor only download candles newer than what it already has,
+#    and keep working offline from the cache
+
+import os
+import shutil
+import numpy as np
+
+CACHE_DIR = "candle_cache"
+
+# Binance kline fields (minus the unused "ignore") and how I store them
+COLUMNS = {
+    "open_time": "<i8",
+    "open": "<f8",
+    "high": "<f8",
+    "low": "<f8",
+    "close": "<f8",
+    "volume": "<f8",
+    "close_time": "<i8",
+    "quote_asset_volume": "<f8",
+    "num_trades": "<i8",
+    "taker_buy_base": "<f8",
+    "taker_buy_quote": "<f8",
+}
+
+
+def klines_to_columns(raw):
+    """
+    Turn Binance's list-of-lists JSON into one NumPy array per column.
+    Binance sends prices/volumes as strings; np.asarray converts the whole column at once.
+    """
+    columns = {}
+    for i, (name, dtype) in enumerate(COLUMNS.items()):
+        columns[name] = np.asarray([row[i] for row in raw], dtype=np.dtype(dtype).type)
+    return columns
+
+
+class CandleStore:
+    """Append-only columnar candle files under root/<SYMBOL>_<interval>/."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}")
+
+    def _path(self, symbol, interval, column):
+        return os.path.join(self._dir(symbol, interval), f"{column}.bin")
+
+    def keys(self):
+        """(symbol, interval) pairs that have a folder in the store."""
+        if not os.path.isdir(self.root):
+            return
+        for name in sorted(os.listdir(self.root)):
+            symbol, _, interval = name.partition("_")
+            if interval:
+                yield symbol, interval
+
+    def count(self, symbol, interval):
+        """Number of complete rows (a crash mid-append can leave columns uneven, so take the shortest)."""
+        counts = []
+        for column, dtype in COLUMNS.items():
+            path = self._path(symbol, interval, column)
+            counts.append(os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0)
+        return min(counts)
+
+    def last_close_time(self, symbol, interval):
+        """close_time (ms) of the newest stored candle, or None if nothing is stored."""
+        n = self.count(symbol, interval)
+        if n == 0:
+            return None
+        return int(np.memmap(self._path(symbol, interval, "close_time"), dtype="<i8", mode="r")[n - 1])
+
+    def first_open_time(self, symbol, interval):
+        """open_time (ms) of the oldest stored candle, or None if nothing is stored."""
+        if self.count(symbol, interval) == 0:
+            return None
+        return int(np.memmap(self._path(symbol, interval, "open_time"), dtype="<i8", mode="r")[0])
+
+    def prepend(self, symbol, interval, older):
+        """
+        Put the candles another CandleStore (`older`) has for this key in front of mine,
+        for backfilling history. Only rows that close before my oldest candle are used.
+        The merged columns are written to a new folder that then replaces the old one,
+        so a crash never leaves columns of different lengths. Returns the number of rows added.
+        """
+        first = self.first_open_time(symbol, interval)
+        n_older = older.count(symbol, interval)
+        if n_older and first is not None:
+            close = np.memmap(older._path(symbol, interval, "close_time"), dtype="<i8", mode="r", shape=(n_older,))
+            n_older = int(np.searchsorted(close, first))  # older rows that end before my first candle
+            del close
+        if n_older == 0:
+            return 0
+        n_mine = self.count(symbol, interval)
+        folder = self._dir(symbol, interval)
+        new_folder, old_folder = folder + ".new", folder + ".old"
+        for leftover in (new_folder, old_folder):           # from a run that crashed half-way
+            shutil.rmtree(leftover, ignore_errors=True)
+        os.makedirs(new_folder)
+        for column, dtype in COLUMNS.items():
+            size = np.dtype(dtype).itemsize
+            with open(os.path.join(new_folder, f"{column}.bin"), "wb") as out:
+                for store, rows in ((older, n_older), (self, n_mine)):
+                    if rows:
+                        with open(store._path(symbol, interval, column), "rb") as f:
+                            remaining = rows * size
+                            while remaining:
+                                block = f.read(min(remaining, 1 << 24))
+                                out.write(block)
+                                remaining -= len(block)
+        if os.path.isdir(folder):
+            os.replace(folder, old_folder)
+        os.replace(new_folder, folder)
+        shutil.rmtree(old_folder, ignore_errors=True)
+        return n_older
+
+    def append(self, symbol, interval, columns):
+        """
+        Append candles (a dict of column arrays, oldest first).
+        Anything not newer than the last stored candle is skipped, so re-fetching overlaps is harmless.
+        Returns the number of rows written.
+        """
+        n_existing = self.count(symbol, interval)
+        last = self.last_close_time(symbol, interval)
+        keep = slice(None) if last is None else np.asarray(columns["close_time"]) > last
+        rows = len(np.asarray(columns["close_time"])[keep])
+        if rows == 0:
+            return 0
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+        for column, dtype in COLUMNS.items():
+            path = self._path(symbol, interval, column)
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.seek(n_existing * np.dtype(dtype).itemsize)  # overwrite any half-written tail
+                f.write(np.asarray(columns[column], dtype=dtype)[keep].tobytes())
+                f.truncate()
+        return rows
+
+    def load(self, symbol, interval, last=None):
+        """
+        Read stored candles as a dict of column arrays (oldest first).
+        last=N only reads the newest N rows.
+        """
+        n = self.count(symbol, interval)
+        start = 0 if last is None else max(n - int(last), 0)
+        out = {}
+        for column, dtype in COLUMNS.items():
+            if n == 0:
+                out[column] = np.empty(0, dtype=dtype)
+                continue
+            mm = np.memmap(self._path(symbol, interval, column), dtype=dtype, mode="r", shape=(n,))
+            out[column] = np.array(mm[start:n])  # copy so the file isn't held open
+            del mm
+        return out
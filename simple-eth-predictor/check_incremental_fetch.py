@@ -0,0 +1,126 @@
+# Check for the predictor's cached, incremental candle download
+#  - starts a local http.server that answers like Binance's /api/v3/klines
+#    (daily candles up to a "server now" I can move forward)
+#  - run 1 (empty cache): one request without startTime, candles get cached
+#  - run 2 (5 days later): the only request asks for startTime = last stored
+#    close_time + 1, and the cache grows by exactly the new closed candles
+#  - run 3 (offline=True) and run 4 (server returns 503) work from the cache
+#    without downloading anything new
+#  - run 5 (days=90 after caching 60): the missing older candles are fetched
+#    with endTime = first cached open_time - 1 and put in front of the cache
+# Run: python check_incremental_fetch.py
+
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench_utils import load_predictor
+from candle_store import CandleStore
+
+DAY_MS = 86_400_000
+
+
+class FakeBinance(BaseHTTPRequestHandler):
+    """Daily klines (any symbol) with listed_ms <= open_time <= FakeBinance.now_ms (and
+    <= endTime when given); records every query. Each (status, Retry-After) in `errors`
+    is answered once, in order, before the real data (e.g. [(429, "1")])."""
+
+    now_ms = 0
+    listed_ms = 0
+    fail = False
+    errors = []
+    requests = []
+
+    def do_GET(self):
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        FakeBinance.requests.append(query)
+        if FakeBinance.fail or FakeBinance.errors:
+            status, retry_after = FakeBinance.errors.pop(0) if FakeBinance.errors else (503, None)
+            self.send_response(status)
+            if retry_after is not None:
+                self.send_header("Retry-After", retry_after)
+            self.end_headers()
+            return
+        limit = int(query.get("limit", 500))
+        last_open = min(FakeBinance.now_ms, int(query.get("endTime", FakeBinance.now_ms))) // DAY_MS * DAY_MS
+        if "startTime" in query:                     # oldest first from startTime, like Binance
+            first_open = -(-int(query["startTime"]) // DAY_MS) * DAY_MS
+        else:                                        # no startTime: the newest `limit` candles
+            first_open = last_open - (limit - 1) * DAY_MS
+        first_open = max(first_open, -(-FakeBinance.listed_ms // DAY_MS) * DAY_MS)  # nothing before the listing
+        opens = range(first_open, last_open + 1, DAY_MS)[:limit]
+        body = json.dumps([[t, str(2000 + i), "1", "1", str(2000 + i), "10", t + DAY_MS - 1, "1", 5, "1", "1", "0"]
+                           for i, t in enumerate(opens)]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    predictor = load_predictor()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBinance)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v3/klines"
+    real_now = int(time.time() * 1000)
+
+    with tempfile.TemporaryDirectory() as folder:
+        store = CandleStore(folder)
+
+        # run 1: empty cache, the server's newest candle finished 5 days ago
+        FakeBinance.now_ms = real_now - 6 * DAY_MS
+        FakeBinance.requests = []
+        predictor.fetch_eth_daily(days=60, store=store, url=url)
+        assert len(FakeBinance.requests) == 1 and "startTime" not in FakeBinance.requests[0]
+        first_count = store.count("ETHUSDT", "1d")
+        last_close = store.last_close_time("ETHUSDT", "1d")
+        assert first_count == 60, first_count
+
+        # run 2: five more days exist (plus today's open candle, which isn't cached)
+        FakeBinance.now_ms = real_now
+        FakeBinance.requests = []
+        df = predictor.fetch_eth_daily(days=60, store=store, url=url)
+        assert len(FakeBinance.requests) == 1, FakeBinance.requests
+        assert int(FakeBinance.requests[0]["startTime"]) == last_close + 1, FakeBinance.requests[0]
+        cols = store.load("ETHUSDT", "1d")
+        new = cols["open_time"][first_count:]
+        assert len(new) == 5 and new[0] > last_close, new
+        assert (cols["open_time"][1:] - cols["open_time"][:-1] == DAY_MS).all(), "gap or duplicate in the cache"
+        assert len(df) == 60
+
+        # run 3: offline, no request at all
+        FakeBinance.requests = []
+        df = predictor.fetch_eth_daily(days=60, store=store, url=url, offline=True)
+        assert FakeBinance.requests == [] and len(df) == 60
+
+        # run 4: the server fails, the cache is used instead
+        FakeBinance.fail = True
+        df = predictor.fetch_eth_daily(days=60, store=store, url=url)
+        assert len(FakeBinance.requests) == 1 and len(df) == 60
+        assert store.count("ETHUSDT", "1d") == first_count + 5
+
+        # run 5: more days than cached, the older candles are backfilled
+        FakeBinance.fail = False
+        FakeBinance.requests = []
+        first_open = store.first_open_time("ETHUSDT", "1d")
+        df = predictor.fetch_eth_daily(days=90, store=store, url=url)
+        assert len(df) == 90, len(df)
+        assert len(FakeBinance.requests) == 2 and int(FakeBinance.requests[1]["endTime"]) == first_open - 1
+        cols = store.load("ETHUSDT", "1d")
+        assert len(cols["open_time"]) == 89 and cols["open_time"][-1] < real_now  # today's candle isn't cached
+        assert (cols["open_time"][1:] - cols["open_time"][:-1] == DAY_MS).all(), "gap or duplicate after backfill"
+
+    server.shutdown()
+    print("OK: second run only asked for candles after the last cached close_time; offline and fallback "
+          "used the cache; a longer history was backfilled")
+
+
+if __name__ == "__main__":
+    main()
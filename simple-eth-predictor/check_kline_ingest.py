@@ -0,0 +1,106 @@
+# Check for kline_ingest.py against a local stand-in for Binance
+#  - reuses check_incremental_fetch's FakeBinance (daily candles, startTime /
+#    endTime / limit like the real endpoint, a listing date, scripted errors)
+#  - pagination: 2,501 days arrive in pages of 1000, contiguous, no duplicates
+#  - a rerun only asks for candles after the last cached close_time
+#  - a --start older than the cache is backfilled through the staging store and
+#    CandleStore.prepend, stopping at the listing date; a later --start leaves no gap
+#  - 429 / 503 answers are retried, with Retry-After as seconds or as an HTTP date
+# Run: python check_kline_ingest.py
+
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer
+
+import requests
+
+from candle_store import CandleStore
+from check_incremental_fetch import DAY_MS, FakeBinance
+from kline_ingest import fetch_page, ingest_one, make_session, retry_after_seconds
+
+
+def check_contiguous(store, symbol):
+    opens = store.load(symbol, "1d")["open_time"]
+    assert len(opens) and (opens[1:] - opens[:-1] == DAY_MS).all(), "gap or duplicate in the cache"
+    return opens
+
+
+def main():
+    # Retry-After parsing on its own
+    assert retry_after_seconds("5") == 5.0 and retry_after_seconds(None) is None
+    assert retry_after_seconds("soon") is None
+    assert 55 <= retry_after_seconds(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert retry_after_seconds(formatdate(time.time() - 60, usegmt=True)) == 0.0
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBinance)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v3/klines"
+    session = make_session(1)
+    # the server starts 3 days behind, so a later run can find newer candles
+    # (ingest_one decides which candles are finished from the real clock)
+    real_now = int(time.time() * 1000)
+    today = real_now // DAY_MS * DAY_MS
+    FakeBinance.now_ms = real_now - 3 * DAY_MS
+    start = today - 2503 * DAY_MS
+    FakeBinance.listed_ms = start - 500 * DAY_MS
+
+    with tempfile.TemporaryDirectory() as folder:
+        store = CandleStore(folder)
+
+        # pagination: 2,501 finished days in 3 pages
+        FakeBinance.requests = []
+        assert ingest_one(store, session, url, "ETHUSDT", "1d", start) == 2501
+        assert len(FakeBinance.requests) == 3, FakeBinance.requests
+        opens = check_contiguous(store, "ETHUSDT")
+        assert opens[0] == start and opens[-1] == today - 3 * DAY_MS
+
+        # rerun: one request from the last close_time, nothing new
+        FakeBinance.requests = []
+        last_close = store.last_close_time("ETHUSDT", "1d")
+        assert ingest_one(store, session, url, "ETHUSDT", "1d", start) == 0
+        assert [int(q["startTime"]) for q in FakeBinance.requests] == [last_close + 1]
+
+        # backfill: start before the listing → everything from the listing, put in front
+        FakeBinance.requests = []
+        assert ingest_one(store, session, url, "ETHUSDT", "1d", today - 4000 * DAY_MS) == 500
+        assert int(FakeBinance.requests[0]["endTime"]) == start - 1
+        opens = check_contiguous(store, "ETHUSDT")
+        assert opens[0] == FakeBinance.listed_ms and len(opens) == 3001
+        assert not os.path.exists(os.path.join(folder, ".backfill")), "staging store left behind"
+
+        # the server catches up; a start later than the cache continues from the last
+        # cached candle (no gap), and today's open candle isn't cached
+        FakeBinance.now_ms = real_now
+        assert ingest_one(store, session, url, "ETHUSDT", "1d", today) == 2
+        assert check_contiguous(store, "ETHUSDT")[-1] == today - DAY_MS
+
+        # retries: 429 with seconds, 503 with an HTTP date, then the data
+        FakeBinance.requests = []
+        FakeBinance.errors = [(429, "0"), (503, formatdate(time.time() - 1, usegmt=True))]
+        raw = fetch_page(session, url, "BTCUSDT", "1d", start, start + 9 * DAY_MS, backoff=0.01)
+        assert len(raw) == 10 and len(FakeBinance.requests) == 3 and not FakeBinance.errors
+
+        # a Retry-After longer than the backoff is waited for
+        FakeBinance.errors = [(429, "1")]
+        began = time.perf_counter()
+        fetch_page(session, url, "BTCUSDT", "1d", start, start, backoff=0.01)
+        assert time.perf_counter() - began >= 1.0
+
+        # retries used up: the last error is raised
+        FakeBinance.errors = [(503, None)] * 3
+        try:
+            fetch_page(session, url, "BTCUSDT", "1d", start, start, retries=2, backoff=0.01)
+            raise AssertionError("expected an HTTPError")
+        except requests.HTTPError:
+            pass
+
+    server.shutdown()
+    print("OK: paged ingest, rerun from the last close_time, backfill via prepend, no gap on a later "
+          "start, Retry-After as seconds and HTTP date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# Bulk kline ingestion into the local candle store
+# What this does:
+#  - downloads years of history for many symbols / intervals (1m, 1h, 1d, ...)
+#  - pages through startTime/endTime windows of 1000 candles (Binance's max per call)
+#  - one pooled requests.Session shared by a bounded number of worker threads
+#  - retries with exponential backoff on network errors, 429/418 and 5xx
+#  - every page goes straight into CandleStore, so nothing big is held in memory
+#  - a --start older than the cached candles is backfilled: the older pages go into a
+#    staging store first and are then put in front of the cache in one go
+#
+# Run: python kline_ingest.py --symbols ETHUSDT BTCUSDT --intervals 1h 1d --start 2021-01-01
+
+import argparse, os, random, shutil, time
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from candle_store import CandleStore, klines_to_columns
+
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+PAGE_LIMIT = 1000                                   # Binance returns at most 1000 candles per call
+RETRY_STATUS = {418, 429, 500, 502, 503, 504}       # rate limited / server trouble → try again
+HEADERS = {"User-Agent": "Day6-ETH-Predictor/1.0 (learning project)"}
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
+}
+
+
+def to_ms(when):
+    """"YYYY-MM-DD" / datetime / ms int → milliseconds since 1970 (UTC)."""
+    if isinstance(when, (int, np.integer)):
+        return int(when)
+    return int(np.datetime64(when, "ms").astype(np.int64))
+
+
+def make_session(pool_size=8):
+    """A requests.Session whose connection pool fits pool_size concurrent workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def retry_after_seconds(value):
+    """Retry-After header → seconds to wait. It's either a number of seconds or an
+    HTTP date ("Wed, 21 Oct 2026 07:28:00 GMT"); None if missing or unreadable."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def fetch_page(session, url, symbol, interval, start_ms, end_ms, retries=5, backoff=0.5, timeout=20):
+    """
+    One klines call for [start_ms, end_ms]. Retries with exponential backoff (plus a little
+    jitter so parallel workers don't retry in lockstep), honouring Retry-After when sent.
+    """
+    params = {"symbol": symbol, "interval": interval, "startTime": start_ms,
+              "endTime": end_ms, "limit": PAGE_LIMIT}
+    for attempt in range(retries + 1):
+        wait = backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+        try:
+            r = session.get(url, params=params, timeout=timeout)
+            if r.status_code not in RETRY_STATUS:
+                r.raise_for_status()
+                return r.json()
+            wait = max(wait, retry_after_seconds(r.headers.get("Retry-After")) or 0.0)
+            error = requests.HTTPError(f"{r.status_code} from {url}", response=r)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if attempt < retries:
+            time.sleep(wait)
+    raise error
+
+
+def _page_into(store, session, url, symbol, interval, cursor, end_ms, now_ms, retries, backoff):
+    """Page [cursor, end_ms] oldest first, appending each page's finished candles. Returns rows added."""
+    added = 0
+    while cursor <= end_ms:
+        raw = fetch_page(session, url, symbol, interval, cursor, end_ms, retries, backoff)
+        if not raw:
+            break                                   # nothing left in the window
+        page = klines_to_columns(raw)
+        closed = page["close_time"] < now_ms        # never cache a candle that is still open
+        added += store.append(symbol, interval, {c: v[closed] for c, v in page.items()})
+        if not closed.all() or len(raw) < PAGE_LIMIT:
+            break
+        cursor = int(page["close_time"][-1]) + 1
+    return added
+
+
+def ingest_one(store, session, url, symbol, interval, start, end=None, retries=5, backoff=0.5):
+    """
+    Fill one (symbol, interval) in the store from start up to end (default now),
+    appending each finished page as it arrives. Returns rows added.
+    - start before the oldest cached candle: [start, oldest) is backfilled into a
+      staging store, then prepended to the cache
+    - new candles always continue from the last cached one (even if start is later),
+      so the cache never gets a gap
+    Binance returns the first 1000 candles inside [startTime, endTime], so gaps
+    (e.g. dates before a pair was listed) are skipped without extra calls.
+    """
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Unknown interval: {interval}")
+    now_ms = int(time.time() * 1000)
+    end_ms = min(to_ms(end), now_ms) if end is not None else now_ms
+    start_ms = to_ms(start)
+    added = 0
+
+    first_open = store.first_open_time(symbol, interval)
+    if first_open is not None and start_ms < first_open:
+        staging = CandleStore(os.path.join(store.root, ".backfill", f"{symbol}_{interval}"))
+        shutil.rmtree(staging.root, ignore_errors=True)  # leftovers from an interrupted backfill
+        _page_into(staging, session, url, symbol, interval, start_ms, min(first_open - 1, end_ms),
+                   now_ms, retries, backoff)
+        added += store.prepend(symbol, interval, staging)
+        shutil.rmtree(staging.root, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(staging.root))      # .backfill, once no other pair is using it
+        except OSError:
+            pass
+
+    last_close = store.last_close_time(symbol, interval)
+    if last_close is None:
+        cursor = start_ms
+    else:
+        if start_ms > last_close + 1:
+            print(f"{symbol} {interval}: start is after the cached candles; "
+                  f"continuing from the last cached one so there's no gap")
+        cursor = last_close + 1
+    return added + _page_into(store, session, url, symbol, interval, cursor, end_ms, now_ms, retries, backoff)
+
+
+def ingest(symbols, intervals, start, end=None, store=None, url=BINANCE_KLINES_URL,
+           max_workers=8, retries=5, backoff=0.5, session=None):
+    """
+    Ingest every (symbol, interval) pair with at most max_workers requests in flight.
+    Each pair is paged in order by one worker (so its files are only ever appended in order);
+    different pairs run in parallel. Returns {(symbol, interval): rows added}.
+    """
+    store = store if store is not None else CandleStore()
+    session = session if session is not None else make_session(max_workers)
+    jobs = [(s.upper(), i) for s in symbols for i in intervals]
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(ingest_one, store, session, url, s, i, start, end, retries, backoff): (s, i)
+                   for s, i in jobs}
+        for future in as_completed(futures):
+            key = futures[future]
+            results[key] = future.result()
+            print(f"{key[0]} {key[1]}: +{results[key]:,} candles")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download kline history into the local candle store.")
+    parser.add_argument("--symbols", nargs="+", default=["ETHUSDT"])
+    parser.add_argument("--intervals", nargs="+", default=["1d"], choices=sorted(INTERVAL_MS))
+    parser.add_argument("--start", required=True, help="first date, e.g. 2021-01-01")
+    parser.add_argument("--end", default=None, help="last date (default: now)")
+    parser.add_argument("--workers", type=int, default=8, help="max parallel requests")
+    parser.add_argument("--cache", default=None, help="candle cache folder")
+    parser.add_argument("--url", default=BINANCE_KLINES_URL)
+    args = parser.parse_args(argv)
+
+    store = CandleStore(args.cache) if args.cache else CandleStore()
+    start = time.perf_counter()
+    results = ingest(args.symbols, args.intervals, args.start, args.end, store, args.url, args.workers)
+    print(f"Done: {sum(results.values()):,} candles in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
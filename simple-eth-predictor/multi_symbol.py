@@ -0,0 +1,164 @@
+# Multi-symbol mode for the ETH predictor
+# What this does:
+#  - builds the same six features as build_features for many pairs at once:
+#    prices / volumes sit in one wide table (date x symbol), so every rolling
+#    window runs once for all symbols instead of once per symbol
+#  - stacks them into a 3-D array X[symbol, time, feature] (plus y[symbol, time])
+#  - fits one linear model per symbol in a single batched least-squares solve
+#    (NumPy works on the whole stack), instead of 50 separate sklearn pipelines
+#  - symbols with a shorter history (a recently listed pair, a missing candle)
+#    keep NaN rows that get zero weight, instead of shortening every symbol
+#  - reports the same metrics as train_and_evaluate, one row per symbol
+# Run: python multi_symbol.py --symbols ETHUSDT BTCUSDT SOLUSDT --interval 1d
+#      (reads candles from the local candle store; fill it with kline_ingest.py)
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from candle_store import CACHE_DIR, CandleStore
+
+
+def load_symbols(symbols, interval="1d", store=None, last=None):
+    """Closed candles for every symbol from the candle store → (prices, volumes) wide DataFrames."""
+    store = store if store is not None else CandleStore()
+    prices, volumes = {}, {}
+    for symbol in symbols:
+        cols = store.load(symbol, interval, last=last)
+        if len(cols["close"]) == 0:
+            raise RuntimeError(f"No cached {symbol} {interval} candles; run kline_ingest.py first.")
+        index = pd.to_datetime(cols["close_time"], unit="ms", utc=True)
+        prices[symbol.upper()] = pd.Series(cols["close"], index=index)
+        volumes[symbol.upper()] = pd.Series(cols["volume"], index=index)
+    return pd.DataFrame(prices), pd.DataFrame(volumes)
+
+
+def build_features_many(prices, volumes, window=7):
+    """
+    prices / volumes: DataFrames with one column per symbol (NaN before a pair was listed
+    or where a candle is missing).
+    Returns X with shape (symbols, rows, 6) in FEATURES order, y with shape (symbols, rows),
+    the dates and the symbol names. All symbols share one time axis: a date is kept when at
+    least one symbol has a full feature row and a target there. A symbol's rows without one
+    stay NaN and are left out of its fit and metrics (see valid_rows), so one young pair
+    doesn't cut every other symbol's history down to its own.
+    """
+    ma = prices.rolling(window).mean()
+    ret = prices.pct_change(fill_method=None)
+    features = [
+        prices.shift(1),                                  # lag_1
+        ma,                                               # ma7
+        prices / ma,                                      # price_vs_ma7
+        ret,                                              # ret_1d
+        ret.rolling(window).std(),                        # vol_7d
+        volumes / volumes.rolling(window).mean(),         # volume_ratio
+    ]
+    target = prices.shift(-1)                             # tomorrow's price
+    X = np.stack([f.to_numpy(dtype=np.float64) for f in features], axis=-1)  # (rows, symbols, 6)
+    y = target.to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(X).any(axis=2) | np.isnan(y))     # (rows, symbols)
+    keep = valid.any(axis=1)
+    X = np.ascontiguousarray(X[keep].transpose(1, 0, 2))  # → (symbols, rows, 6)
+    y = np.ascontiguousarray(y[keep].T)
+    y[~valid[keep].T] = np.nan                            # a row counts only if features and target exist
+    return X, y, prices.index[keep], list(prices.columns)
+
+
+def valid_rows(X, y):
+    """(symbols, rows) mask of the rows with a full feature row and a target."""
+    return ~(np.isnan(X).any(axis=2) | np.isnan(y))
+
+
+def fit_many(X, y):
+    """
+    One least-squares fit per symbol with an intercept, all in one batched solve.
+    X: (symbols, rows, features), y: (symbols, rows) → coefficients (symbols, features + 1),
+    the last column being the intercept. Rows with NaNs get zero weight, so each symbol is
+    fitted on its own valid rows only. Features are standardized per symbol first
+    (like StandardScaler), which keeps the solve well-conditioned without changing predictions.
+    """
+    valid = valid_rows(X, y)
+    w = valid[..., None]
+    n = np.maximum(valid.sum(axis=1), 1)[:, None, None]
+    X = np.where(w, X, 0.0)
+    mean = X.sum(axis=1, keepdims=True) / n
+    std = np.sqrt((np.where(w, X - mean, 0.0) ** 2).sum(axis=1, keepdims=True) / n)
+    std = np.where(std > 0, std, 1.0)
+    A = np.concatenate(((X - mean) / std, np.ones(X.shape[:2] + (1,))), axis=2) * w  # invalid rows → 0
+    theta = (np.linalg.pinv(A) @ np.where(valid, y, 0.0)[..., None])[..., 0]  # batched SVD solve, same answer as lstsq
+    coef = theta[:, :-1] / std[:, 0]
+    intercept = theta[:, -1] - (coef * mean[:, 0]).sum(axis=1)
+    return np.column_stack((coef, intercept))
+
+
+def predict_many(coef, X):
+    """Predictions for every symbol: (symbols, rows)."""
+    return np.einsum("str,sr->st", X, coef[:, :-1]) + coef[:, -1:]
+
+
+def _masked_mean(values, mask):
+    return np.where(mask, values, 0.0).sum(axis=1) / np.maximum(mask.sum(axis=1), 1)
+
+
+def metrics_many(y_test, yhat_test, mask=None):
+    """walk_forward.fold_metrics for every symbol at once (rows = symbols), over the
+    entries where mask is True (all of them if None)."""
+    mask = np.ones(y_test.shape, dtype=bool) if mask is None else mask
+    cols = np.arange(y_test.shape[1])
+    last = np.maximum.accumulate(np.where(mask, cols, -1), axis=1)   # newest masked row so far
+    before = np.concatenate((np.full((len(mask), 1), -1), last[:, :-1]), axis=1)
+    today = np.take_along_axis(y_test, np.where(before >= 0, before, cols), axis=1)  # naive "tomorrow = today"
+    rmse = np.sqrt(_masked_mean((y_test - yhat_test) ** 2, mask))
+    naive_rmse = np.sqrt(_masked_mean((y_test - today) ** 2, mask))
+    return {
+        "rmse": rmse,
+        "mae": _masked_mean(np.abs(y_test - yhat_test), mask),
+        "naive_rmse": naive_rmse,
+        "lift": naive_rmse - rmse,
+        "dir_acc": _masked_mean((y_test > today) == (yhat_test > today), mask) * 100.0,
+    }
+
+
+def train_and_evaluate_many(X, y, symbols, train_ratio=0.8):
+    """
+    Same time-ordered split as train_and_evaluate, for every symbol together: each symbol's
+    own valid rows are split train_ratio / rest, so a young pair still gets a test period.
+    Returns (report DataFrame indexed by symbol, coefficients, predictions for every row;
+    compare them with y where the report's test rows are).
+    """
+    valid = valid_rows(X, y)
+    n_train = (valid.sum(axis=1) * train_ratio).astype(int)[:, None]
+    train = valid & (np.cumsum(valid, axis=1) <= n_train)
+    test = valid & ~train
+    coef = fit_many(np.where(train[..., None], X, np.nan), y)
+    yhat = predict_many(coef, X)
+    report = pd.DataFrame(metrics_many(y, yhat, test), index=pd.Index(symbols, name="symbol"))
+    report.insert(0, "train_rmse", np.sqrt(_masked_mean((y - yhat) ** 2, train)))
+    report.insert(0, "rows", valid.sum(axis=1))
+    return report, coef, yhat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the simple predictor on many symbols at once.")
+    parser.add_argument("--symbols", nargs="+", required=True)
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--last", type=int, default=365, help="newest N candles per symbol")
+    parser.add_argument("--train-ratio", type=float, default=0.8)
+    parser.add_argument("--candles", default=CACHE_DIR, help="candle store folder")
+    args = parser.parse_args(argv)
+
+    prices, volumes = load_symbols(args.symbols, args.interval, CandleStore(args.candles), args.last)
+    X, y, dates, symbols = build_features_many(prices, volumes)
+    print(f"Feature stack: {X.shape[0]} symbols x {X.shape[1]} rows x {X.shape[2]} features "
+          f"({dates[0].date()} → {dates[-1].date()})")
+    rows = valid_rows(X, y).sum(axis=1)
+    for symbol, n in zip(symbols, rows):
+        if n < X.shape[1]:
+            print(f"{symbol}: {X.shape[1] - n} of {X.shape[1]} rows left out (not listed yet or candles missing)")
+    report, _, _ = train_and_evaluate_many(X, y, symbols, args.train_ratio)
+    print(report.sort_values("lift", ascending=False).to_string(float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Online (streaming) version of build_features
+# What this does:
+#  - keeps small ring buffers of the last 7 prices, returns and volumes
+#  - updates a running mean / M2 (sliding-window Welford) for each buffer
+#  - so one new candle updates all six features in constant time, instead of
+#    re-running pandas rolling() over the whole DataFrame
+# The numbers match build_features (checked in bench_online_features.py).
+# FeatureWindows holds many warmed-up states side by side as NumPy arrays, so
+# multi-step forecasts for many symbols / scenarios step forward together.
+
+import math
+
+import numpy as np
+
+FEATURES = ["lag_1", "ma7", "price_vs_ma7", "ret_1d", "vol_7d", "volume_ratio"]  # same order as build_features
+
+
+class RollingWindow:
+    """Fixed-size ring buffer with a running mean and sum of squared deviations (M2)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.buf = [0.0] * size
+        self.pos = 0             # where the next value goes
+        self.n = 0               # how many values are in the window (≤ size)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def full(self):
+        return self.n == self.size
+
+    def push(self, x):
+        if self.n < self.size:                        # still filling up: plain Welford
+            self.n += 1
+            delta = x - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (x - self.mean)
+        else:                                         # full: swap the oldest value for the new one
+            old = self.buf[self.pos]
+            old_mean = self.mean
+            self.mean += (x - old) / self.size
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        if self.pos == 0 and self.full:
+            self._resync()
+
+    def _resync(self):
+        """Recompute mean/M2 exactly once per lap of the ring (amortized O(1)) so rounding never drifts."""
+        self.mean = math.fsum(self.buf) / self.size
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.buf)
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, same as pandas rolling().std())."""
+        return math.sqrt(max(self.m2, 0.0) / (self.n - 1)) if self.n > 1 else float("nan")
+
+    def values(self):
+        """Window contents, oldest first."""
+        if not self.full:
+            return self.buf[:self.n]
+        return self.buf[self.pos:] + self.buf[:self.pos]
+
+    def copy(self):
+        other = RollingWindow(self.size)
+        other.buf, other.pos, other.n, other.mean, other.m2 = list(self.buf), self.pos, self.n, self.mean, self.m2
+        return other
+
+
+class OnlineFeatures:
+    """
+    Feed candles one at a time with update(price, volume).
+    Once there are window + 1 candles, every update returns the feature row
+    [lag_1, ma7, price_vs_ma7, ret_1d, vol_7d, volume_ratio] for that candle.
+    """
+
+    def __init__(self, window=7):
+        self.window = window
+        self.prices = RollingWindow(window)
+        self.returns = RollingWindow(window)
+        self.volumes = RollingWindow(window)
+        self.last_price = None
+        self.row = None          # latest feature row (None until warmed up)
+
+    @property
+    def ready(self):
+        return self.row is not None
+
+    def update(self, price, volume):
+        """Add one candle; returns its feature row, or None while still warming up."""
+        price, volume = float(price), float(volume)
+        prev = self.last_price
+        self.last_price = price
+        self.prices.push(price)
+        self.volumes.push(volume)
+        if prev is None:
+            return None
+        ret = price / prev - 1.0                      # same as pct_change()
+        self.returns.push(ret)
+        if not self.returns.full:
+            return None
+        ma = self.prices.mean
+        self.row = [prev, ma, price / ma, ret, self.returns.std, volume / self.volumes.mean]
+        return self.row
+
+    @classmethod
+    def from_history(cls, prices, volumes, window=7):
+        """Warm up a state from past candles (e.g. df["price"], df["volume"])."""
+        state = cls(window)
+        for price, volume in zip(prices, volumes):
+            state.update(price, volume)
+        return state
+
+    def copy(self):
+        """Independent copy (handy for "what if" steps like multi-day forecasts)."""
+        other = OnlineFeatures(self.window)
+        other.prices, other.returns, other.volumes = self.prices.copy(), self.returns.copy(), self.volumes.copy()
+        other.last_price = self.last_price
+        other.row = None if self.row is None else list(self.row)
+        return other
+
+
+class FeatureWindows:
+    """
+    Several feature states stacked as arrays, one row per symbol (or scenario):
+    prices / returns / volumes are (n, window) arrays, oldest value first.
+    Each step is a handful of vectorized operations over all rows at once.
+    """
+
+    def __init__(self, prices, returns, volumes):
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.returns = np.asarray(returns, dtype=np.float64)
+        self.volumes = np.asarray(volumes, dtype=np.float64)
+
+    @classmethod
+    def from_states(cls, states):
+        """Stack warmed-up OnlineFeatures states (all with the same window)."""
+        if not all(s.ready for s in states):
+            raise ValueError("every state needs at least window + 1 candles first")
+        return cls([s.prices.values() for s in states],
+                   [s.returns.values() for s in states],
+                   [s.volumes.values() for s in states])
+
+    def __len__(self):
+        return len(self.prices)
+
+    def features(self):
+        """(n, 6) feature matrix in FEATURES order, same definitions as build_features."""
+        ma = self.prices.mean(axis=1)
+        return np.column_stack((
+            self.prices[:, -2],                                   # lag_1
+            ma,                                                   # ma7
+            self.prices[:, -1] / ma,                              # price_vs_ma7
+            self.returns[:, -1],                                  # ret_1d
+            self.returns.std(axis=1, ddof=1),                     # vol_7d
+            self.volumes[:, -1] / self.volumes.mean(axis=1),      # volume_ratio
+        ))
+
+    def average_volume(self):
+        return self.volumes.mean(axis=1)
+
+    def push(self, prices, volumes):
+        """Add one new candle to every row (prices / volumes: arrays of length n)."""
+        prices = np.asarray(prices, dtype=np.float64)
+        returns = prices / self.prices[:, -1] - 1.0
+        self.prices = np.column_stack((self.prices[:, 1:], prices))
+        self.returns = np.column_stack((self.returns[:, 1:], returns))
+        self.volumes = np.column_stack((self.volumes[:, 1:], np.asarray(volumes, dtype=np.float64)))
@@ -0,0 +1,110 @@
+# Online linear model: running standardization + recursive least squares (RLS)
+# What this does:
+#  - keeps a running mean / variance of every feature (like StandardScaler, but updated per row)
+#  - keeps linear-regression coefficients up to date with RLS: each new row costs O(p²)
+#    instead of re-solving the whole regression
+#  - optional forgetting factor (lam < 1) so old rows slowly count less
+#  - predict() works like the sklearn pipeline's, so forecast_tomorrow can use it as-is
+#
+# When the running mean/std move, the coefficients and RLS matrix are re-expressed
+# in the new scaling exactly (an O(p²) change of coordinates), so with lam=1 the
+# model stays identical to a batch StandardScaler + LinearRegression fit.
+
+import numpy as np
+
+
+class OnlineLinearModel:
+    def __init__(self, n_features, lam=1.0, delta=1e-6):
+        """
+        lam: forgetting factor (1.0 = remember everything, 0.99 ≈ memory of ~100 rows)
+        delta: tiny ridge used to start from scratch without a batch fit
+        """
+        p = n_features
+        self.p = p
+        self.lam = lam
+        self.n = 0
+        self.mean_ = np.zeros(p)                 # running feature mean
+        self._m2 = np.zeros(p)                   # running sum of squared deviations
+        self.scale_ = np.ones(p)                 # std used for standardizing
+        self.theta = np.zeros(p + 1)             # [weights on standardized features, intercept]
+        self.P = np.eye(p + 1) / delta           # inverse (weighted) information matrix
+
+    # -----------------------------
+    # Standardization
+    # -----------------------------
+    @staticmethod
+    def _safe_scale(var):
+        std = np.sqrt(var)
+        return np.where(std > 0, std, 1.0)       # constant features: leave unscaled (like StandardScaler)
+
+    def _rebase(self, new_mean, new_scale):
+        """Re-express theta and P for a new standardization (z' = (x - new_mean) / new_scale)."""
+        # old z = (x - m) / s  →  z = d·z' + c
+        d = new_scale / self.scale_
+        c = (new_mean - self.mean_) / self.scale_
+        p = self.p
+        # theta' = T⁻ᵀ theta  where a = T⁻¹ a',  T⁻¹ = [[diag(d), c], [0, 1]]
+        theta = self.theta
+        self.theta = np.concatenate((d * theta[:p], [c @ theta[:p] + theta[p]]))
+        # P' = T⁻ᵀ P T⁻¹ (only diagonal scaling + one rank-one column, so O(p²))
+        M = self.P.copy()
+        M[:, p] = self.P[:, :p] @ c + self.P[:, p]
+        M[:, :p] = self.P[:, :p] * d
+        P = M.copy()
+        P[p, :] = c @ M[:p, :] + M[p, :]
+        P[:p, :] = d[:, None] * M[:p, :]
+        self.P = P
+        self.mean_, self.scale_ = new_mean, new_scale
+
+    def _augment(self, X):
+        Z = (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+        return np.column_stack((Z, np.ones(len(Z))))
+
+    # -----------------------------
+    # Fitting
+    # -----------------------------
+    def fit(self, X, y):
+        """Batch start (same result as StandardScaler + LinearRegression); then call partial_fit per new row."""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.n = len(X)
+        self.mean_ = X.mean(axis=0)
+        self._m2 = ((X - self.mean_) ** 2).sum(axis=0)
+        self.scale_ = self._safe_scale(self._m2 / self.n)
+        A = self._augment(X)
+        self.P = np.linalg.pinv(A.T @ A)
+        self.theta = self.P @ (A.T @ y)
+        return self
+
+    def partial_fit(self, x, y):
+        """Add one row (x: p feature values, y: target). O(p²)."""
+        x = np.asarray(x, dtype=np.float64).ravel()
+        # 1) update the running mean / variance (Welford) and re-base the model to it
+        self.n += 1
+        delta = x - self.mean_
+        new_mean = self.mean_ + delta / self.n
+        self._m2 = self._m2 + delta * (x - new_mean)
+        self._rebase(new_mean, self._safe_scale(self._m2 / self.n))
+        # 2) recursive least squares step
+        a = np.append((x - self.mean_) / self.scale_, 1.0)
+        Pa = self.P @ a
+        gain = Pa / (self.lam + a @ Pa)
+        self.theta = self.theta + gain * (y - self.theta @ a)
+        self.P = (self.P - np.outer(gain, Pa)) / self.lam
+        return self
+
+    # -----------------------------
+    # Using the model
+    # -----------------------------
+    def predict(self, X):
+        """Predictions for a 2-D array / list of rows (same interface as the sklearn pipeline)."""
+        return self._augment(np.atleast_2d(X)) @ self.theta
+
+    @property
+    def coef_(self):
+        """Weights on the raw (unscaled) features."""
+        return self.theta[:self.p] / self.scale_
+
+    @property
+    def intercept_(self):
+        return self.theta[self.p] - self.coef_ @ self.mean_
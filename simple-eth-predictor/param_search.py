@@ -0,0 +1,234 @@
+# Grid / random search over feature windows, lags and train ratios
+# What this does:
+#  - build_features is fixed at 7-day windows, 1 lag and an 80/20 split; this sweeps all three
+#  - the rolling pieces for one window (moving average, return volatility, average volume)
+#    are computed once per (symbol, window) and saved to feature_cache/, so every config
+#    that uses that window - in this run or a later one - just loads them
+#  - the cache has a size limit; the least recently used files are deleted first
+#  - configs are evaluated in a process pool and written to a ranked leaderboard CSV
+# Run: python param_search.py --symbol ETHUSDT --windows 5 7 14 21 --lags 1 2 3 --train-ratios 0.7 0.8
+#      python param_search.py --random 20      (20 random configs from the grid instead of all)
+
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from candle_store import CACHE_DIR, CandleStore
+from walk_forward import fit_predict, fold_metrics
+
+FEATURE_CACHE_DIR = "feature_cache"
+LEADERBOARD = "leaderboard.csv"
+
+
+# -----------------------------
+# On-disk cache of rolling features
+# -----------------------------
+class FeatureCache:
+    """
+    One .npy file per (symbol, interval, window) holding an (n, 3) array:
+    rolling mean of price, rolling std of daily returns, rolling mean of volume.
+    The file name also has the row count and last close_time, so new candles
+    make a fresh entry instead of reusing stale numbers.
+    """
+
+    def __init__(self, root=FEATURE_CACHE_DIR, max_bytes=256 * 1024 ** 2):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, symbol, interval, window, version):
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}_w{window}_{version}.npy")
+
+    def rolling(self, symbol, interval, window, prices, volumes, version):
+        """Cached rolling features for this window, computing + saving them on a miss."""
+        path = self._path(symbol, interval, window, version)
+        try:
+            out = np.load(path, mmap_mode="r")
+            os.utime(path)                                   # mark as recently used
+            return out
+        except (FileNotFoundError, ValueError):
+            pass
+        out = rolling_features(prices, volumes, window)
+        os.makedirs(self.root, exist_ok=True)
+        prefix = f"{symbol.upper()}_{interval}_w{window}_"
+        for name in os.listdir(self.root):                   # older versions of the same key are stale
+            if name.startswith(prefix) and name != os.path.basename(path):
+                self._remove(os.path.join(self.root, name))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, out)
+        os.replace(tmp, path)                                # atomic, so parallel workers never see half a file
+        self.evict()
+        return out
+
+    def size(self):
+        return sum(os.path.getsize(p) for p in self._files())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used files until the cache fits in max_bytes. Returns files removed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        files = sorted(self._files(), key=os.path.getmtime)  # oldest use first
+        total = sum(os.path.getsize(p) for p in files)
+        removed = 0
+        for path in files:
+            if total <= limit:
+                break
+            total -= os.path.getsize(path)
+            removed += self._remove(path)
+        return removed
+
+    def _files(self):
+        if not os.path.isdir(self.root):
+            return []
+        return [os.path.join(self.root, n) for n in os.listdir(self.root) if n.endswith(".npy")]
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:                            # another process got there first
+            return 0
+
+
+def rolling_features(prices, volumes, window):
+    """(n, 3) array: rolling mean price, rolling std of returns, rolling mean volume (same maths as build_features)."""
+    price = pd.Series(prices)
+    ret = price.pct_change()
+    return np.column_stack((
+        price.rolling(window).mean().to_numpy(),
+        ret.rolling(window).std().to_numpy(),
+        pd.Series(volumes).rolling(window).mean().to_numpy(),
+    ))
+
+
+def feature_matrix(prices, volumes, rolled, lags=1):
+    """
+    X / y for one config, like build_features but with any window and number of lags:
+    [lag_1 .. lag_k, ma, price_vs_ma, ret_1d, vol, volume_ratio], target = tomorrow's price.
+    Rows with NaNs (warm-up) and the last row (no target yet) are dropped.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    n = len(prices)
+    ma, vol, vol_avg = rolled[:, 0], rolled[:, 1], rolled[:, 2]
+    ret = np.full(n, np.nan)
+    ret[1:] = prices[1:] / prices[:-1] - 1.0
+    lagged = []
+    for k in range(1, lags + 1):
+        col = np.full(n, np.nan)
+        col[k:] = prices[:-k]
+        lagged.append(col)
+    X = np.column_stack(lagged + [ma, prices / ma, ret, vol, volumes / vol_avg])
+    y = np.full(n, np.nan)
+    y[:-1] = prices[1:]
+    keep = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    return np.ascontiguousarray(X[keep]), y[keep]
+
+
+# -----------------------------
+# Evaluating configs (worker side)
+# -----------------------------
+_data = {}
+
+
+def _init_worker(symbol, interval, prices, volumes, version, cache_root, cache_bytes):
+    _data.update(symbol=symbol, interval=interval, prices=prices, volumes=volumes, version=version,
+                 cache=FeatureCache(cache_root, cache_bytes))
+
+
+def evaluate(config):
+    """Train on the first train_ratio of rows, score the rest (same metrics as train_and_evaluate)."""
+    window, lags, train_ratio = config
+    d = _data
+    rolled = d["cache"].rolling(d["symbol"], d["interval"], window, d["prices"], d["volumes"], d["version"])
+    X, y = feature_matrix(d["prices"], d["volumes"], rolled, lags)
+    split = int(len(X) * train_ratio)
+    if split < X.shape[1] + 1 or split >= len(X) - 1:
+        return None                                          # not enough rows for this config
+    metrics = fold_metrics(y[split:], fit_predict(X[:split], y[:split], X[split:]))
+    return {"window": window, "lags": lags, "train_ratio": train_ratio,
+            "train_rows": split, "test_rows": len(X) - split, **metrics,
+            "rmse_vs_naive": metrics["rmse"] / metrics["naive_rmse"]}
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+def make_configs(windows, lags, train_ratios, n_random=None, seed=0):
+    """Every (window, lags, train_ratio) combination, or n_random of them picked at random."""
+    grid = list(itertools.product(sorted(set(windows)), sorted(set(lags)), sorted(set(train_ratios))))
+    if n_random and n_random < len(grid):
+        grid = random.Random(seed).sample(grid, n_random)
+    return grid
+
+
+def search(prices, volumes, configs, symbol="ETHUSDT", interval="1d", version="",
+           cache=None, max_workers=None):
+    """
+    Evaluate every config and return the leaderboard (best first).
+    Ranked by test RMSE / naive RMSE, since different train ratios test on different windows.
+    """
+    cache = cache or FeatureCache()
+    prices = np.asarray(prices, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    initargs = (symbol, interval, prices, volumes, version, cache.root, cache.max_bytes)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        _init_worker(*initargs)
+        results = [evaluate(c) for c in configs]
+    else:
+        for window in sorted({c[0] for c in configs}):       # fill the cache once, before fanning out
+            cache.rolling(symbol, interval, window, prices, volumes, version)
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=initargs) as pool:
+            results = list(pool.map(evaluate, configs, chunksize=max(1, len(configs) // (max_workers * 4))))
+    board = pd.DataFrame([r for r in results if r is not None])
+    if board.empty:
+        return board
+    board = board.sort_values(["rmse_vs_naive", "rmse"]).reset_index(drop=True)
+    board.insert(0, "rank", np.arange(1, len(board) + 1))
+    return board
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep feature windows / lags / train ratios for the ETH predictor.")
+    parser.add_argument("--symbol", default="ETHUSDT")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--windows", type=int, nargs="+", default=[5, 7, 10, 14, 21, 30])
+    parser.add_argument("--lags", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--train-ratios", type=float, nargs="+", default=[0.6, 0.7, 0.8])
+    parser.add_argument("--random", type=int, default=None, help="evaluate N random configs from the grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--last", type=int, default=None, help="only use the newest N candles")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--candles", default=CACHE_DIR, help="candle store folder")
+    parser.add_argument("--cache-dir", default=FEATURE_CACHE_DIR)
+    parser.add_argument("--cache-mb", type=float, default=256, help="feature cache size limit")
+    parser.add_argument("--out", default=LEADERBOARD)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    store = CandleStore(args.candles)
+    cols = store.load(args.symbol, args.interval, last=args.last)
+    if len(cols["close"]) == 0:
+        raise SystemExit(f"No cached {args.symbol} {args.interval} candles; run kline_ingest.py or the predictor first.")
+    version = f"{len(cols['close'])}_{int(cols['close_time'][-1])}"
+    if args.last:
+        version = f"{int(cols['close_time'][0])}_{version}"
+    configs = make_configs(args.windows, args.lags, args.train_ratios, args.random, args.seed)
+    cache = FeatureCache(args.cache_dir, int(args.cache_mb * 1024 ** 2))
+
+    print(f"{args.symbol} {args.interval}: {len(cols['close']):,} candles, {len(configs)} configs")
+    board = search(cols["close"], cols["volume"], configs, args.symbol, args.interval, version,
+                   cache, args.workers)
+    board.to_csv(args.out, index=False)
+    print(board.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"Leaderboard written to {args.out} | feature cache {cache.size() / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
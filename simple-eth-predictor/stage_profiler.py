@@ -0,0 +1,150 @@
+# Stage timing / profiling for the ETH pipeline
+# What this does:
+#  - wraps each pipeline step (fetch, features, train, ...) in a "stage"
+#  - per stage it records wall time, CPU time (including finished worker processes),
+#    peak Python memory (tracemalloc) and an optional row count
+#  - writes a JSON run report, or a Prometheus-style text file for nightly runs to scrape
+#  - optional: a cProfile dump per stage (<dir>/<stage>.prof, open with snakeviz / pstats)
+#
+# Use it as a context manager:
+#     profiler = StageProfiler()
+#     with profiler.stage("features") as st:
+#         X, y, dates = build_features(df)
+#         st["rows"] = len(X)
+#     profiler.write("run_report.json")
+# or as a decorator: @profiler.timed("train", rows=lambda res: len(res["y_test"]))
+
+import cProfile
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+def _cpu_seconds():
+    t = os.times()                                       # children = worker processes that have exited
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class StageProfiler:
+    def __init__(self, cprofile_dir=None, enabled=True):
+        self.cprofile_dir = cprofile_dir
+        self.enabled = enabled
+        self.stages = []
+        self.started = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._peak = 0                                   # run-wide peak (tracemalloc's is reset per stage)
+        self._owns_tracemalloc = enabled and not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time the block; set st["rows"] inside it to record how many rows the stage handled."""
+        record = {"stage": name, "rows": rows}
+        if not self.enabled:
+            yield record
+            return
+        self._update_peak()
+        tracemalloc.reset_peak()
+        profile = cProfile.Profile() if self.cprofile_dir else None
+        wall0, cpu0 = time.perf_counter(), _cpu_seconds()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+            record["wall_s"] = time.perf_counter() - wall0
+            record["cpu_s"] = _cpu_seconds() - cpu0
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            self._peak = max(self._peak, record["peak_bytes"])
+            if profile:
+                os.makedirs(self.cprofile_dir, exist_ok=True)
+                record["cprofile"] = os.path.join(self.cprofile_dir, f"{name}.prof")
+                profile.dump_stats(record["cprofile"])
+            self.stages.append(record)
+
+    def timed(self, name=None, rows=None):
+        """Decorator version of stage(); rows can be a function of the return value."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__) as record:
+                    result = func(*args, **kwargs)
+                    if rows is not None:
+                        record["rows"] = rows(result)
+                    return result
+            return wrapper
+        return decorate
+
+    def _update_peak(self):
+        if self.enabled and tracemalloc.is_tracing():
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+        return self._peak
+
+    @property
+    def peak_bytes(self):
+        return self._update_peak()
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        self._update_peak()                              # keep the final peak before tracing stops
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracemalloc = False
+
+    # -----------------------------
+    # Reports
+    # -----------------------------
+    def report(self):
+        return {
+            "started": self.started.isoformat(),
+            "total_wall_s": time.perf_counter() - self._t0,
+            "peak_bytes": self.peak_bytes,
+            "stages": self.stages,
+        }
+
+    def summary(self):
+        """A small text table for the console."""
+        lines = [f"{'stage':<20}{'wall s':>9}{'cpu s':>9}{'peak MB':>10}{'rows':>10}"]
+        for s in self.stages:
+            rows = "" if s["rows"] is None else f"{s['rows']:,}"
+            lines.append(f"{s['stage']:<20}{s['wall_s']:>9.3f}{s['cpu_s']:>9.3f}"
+                         f"{s['peak_bytes'] / 1e6:>10.1f}{rows:>10}")
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix="eth_pipeline"):
+        """Prometheus text exposition format (gauges labelled by stage)."""
+        metrics = [
+            ("stage_wall_seconds", "Wall-clock time per stage", "wall_s"),
+            ("stage_cpu_seconds", "CPU time per stage (this process + finished workers)", "cpu_s"),
+            ("stage_peak_bytes", "Peak traced Python memory per stage", "peak_bytes"),
+            ("stage_rows", "Rows handled per stage", "rows"),
+        ]
+        out = []
+        for metric, help_text, key in metrics:
+            out += [f"# HELP {prefix}_{metric} {help_text}", f"# TYPE {prefix}_{metric} gauge"]
+            for s in self.stages:
+                if s.get(key) is not None:
+                    out.append(f'{prefix}_{metric}{{stage="{s["stage"]}"}} {s[key]}')
+        report = self.report()
+        out += [f"# TYPE {prefix}_run_wall_seconds gauge", f"{prefix}_run_wall_seconds {report['total_wall_s']}",
+                f"# TYPE {prefix}_run_peak_bytes gauge", f"{prefix}_run_peak_bytes {report['peak_bytes']}",
+                f"# TYPE {prefix}_run_timestamp_seconds gauge",
+                f"{prefix}_run_timestamp_seconds {self.started.timestamp()}"]
+        return "\n".join(out) + "\n"
+
+    def write(self, path):
+        """Save the report: .prom / .txt → Prometheus text, anything else → JSON."""
+        if path.endswith((".prom", ".txt")):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.report(), indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
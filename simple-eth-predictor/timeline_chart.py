@@ -0,0 +1,83 @@
+# Headless charts for the ETH predictor
+# What this does:
+#  - draws the train/test timeline on a plain matplotlib Figure (no pyplot, no window),
+#    so it can be saved to PNG/SVG on a server without a display
+#  - ChartWriter renders charts in a background process, so the script keeps
+#    computing while the file is written
+#  - matplotlib is only imported inside the functions that draw, so runs that
+#    never make a chart don't pay for importing it
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+NON_INTERACTIVE = {"agg", "svg", "pdf", "ps", "cairo", "pgf", "template"}
+
+
+def is_headless():
+    """True when a chart window can't (or shouldn't) be opened: MPLBACKEND=Agg etc., or no display on Linux.
+    Same check as day04's energy_plot.is_headless."""
+    backend = os.environ.get("MPLBACKEND", "").lower()
+    if backend:
+        return backend in NON_INTERACTIVE
+    return sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def draw_timeline(fig, dates_train, y_train, yhat_train, dates_test, y_test, yhat_test):
+    """Actual vs predicted for the train and test windows, on an existing Figure."""
+    ax = fig.add_subplot()
+    ax.plot(dates_train, y_train, label="Actual (train)")
+    ax.plot(dates_train, yhat_train, label="Predicted (train)")
+    ax.plot(dates_test, y_test, label="Actual (test)")
+    ax.plot(dates_test, yhat_test, label="Predicted (test)")
+    if len(dates_test) > 0:
+        ax.axvline(dates_test[0], linestyle="--", label="Test start")
+    ax.set_title("ETH/USDT — Tomorrow's Close (simple model)")
+    ax.set_ylabel("Price (USDT)")
+    ax.legend()
+    fig.tight_layout()
+
+
+def save_timeline(path, *series):
+    """Render draw_timeline straight to a file (.png, .svg, ... picked from the extension)."""
+    from matplotlib.figure import Figure                 # Figure + savefig uses Agg, no GUI backend
+    fig = Figure(figsize=(12, 5))
+    draw_timeline(fig, *series)
+    fig.savefig(path)
+    return path
+
+
+class ChartWriter:
+    """
+    Runs chart-saving functions in the background.
+    processes=True uses one worker process (real parallelism; the function and its
+    arguments must be picklable), False uses a thread.
+    Failures are reported in close(), in submit order. This is a copy of ChartWriter in
+    day04's energy_plot.py (the day folders don't import each other); keep the two the same.
+    """
+
+    def __init__(self, processes=True):
+        self.processes = processes
+        self._pool = None
+        self.pending = []
+
+    def submit(self, func, *args):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(1) if self.processes else ThreadPoolExecutor(1)
+        future = self._pool.submit(func, *args)
+        self.pending.append(future)
+        return future
+
+    def close(self):
+        """Wait for every chart to be written. Returns the saved paths; failed charts are printed."""
+        paths = []
+        for future in self.pending:
+            try:
+                paths.append(future.result())
+            except Exception as e:
+                print(f"Chart failed: {e}")
+        self.pending = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        return paths